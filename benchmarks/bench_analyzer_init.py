@@ -0,0 +1,80 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: MatrixProfileAnalyzer construction on a replicated openssh.csv, per-row loops vs. vectorized.
+
+Run from the repository root: `python benchmarks/bench_analyzer_init.py --rows 2000000`
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.logparser import log_csv_to_df
+from gateway.matrix_profile import MatrixProfileAnalyzer
+
+
+SOURCE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'openssh.csv')
+
+
+def loop_init(df):
+    # Previous implementation: format check, then one int and one np.datetime64 per row
+    assert pd.to_datetime(df['TimeFull'], format='%d-%m-%Y %H:%M:%S', errors='coerce').notna().all()
+    event_series = []
+    for event in df['EventId']:
+        event_series.append(int(str(event)[1:]))
+    time_series = [np.datetime64(ts) for ts in df['TimeFull']]
+    return event_series, time_series
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rows', type=int, default=2000000)
+    args = arg_parser.parse_args()
+
+    source = log_csv_to_df(SOURCE_CSV, year=2016)
+    df = pd.concat([source] * (args.rows // len(source) + 1), ignore_index=True).iloc[:args.rows]
+    df['EventId'] = df['EventId'].astype('category')
+    # Each copy follows the previous one, so the log stays in time order
+    span = source['TimeFull'].iloc[-1] - source['TimeFull'].iloc[0] + pd.Timedelta('1s')
+    df['TimeFull'] = df['TimeFull'] + span * (np.arange(len(df)) // len(source))
+
+    start = time.perf_counter()
+    event_series, time_series = loop_init(df)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer = MatrixProfileAnalyzer(df)
+    vectorized = time.perf_counter() - start
+
+    assert np.array_equal(analyzer.event_series, event_series), "vectorized event series differs from the loop"
+    assert np.array_equal(analyzer.time_series, np.array(time_series, dtype='datetime64[ns]'))
+    loop_mb = (sys.getsizeof(event_series) + sys.getsizeof(time_series)
+               + sum(sys.getsizeof(x) for x in event_series[:1000]) * len(event_series) / 1000
+               + sum(sys.getsizeof(x) for x in time_series[:1000]) * len(time_series) / 1000) / 2 ** 20
+    arrays_mb = (analyzer.event_series.nbytes + analyzer.event_numbers.nbytes + analyzer.time_series.nbytes) / 2 ** 20
+    print(f"rows       : {args.rows}")
+    print(f"loops      : {loop:6.2f}s  {loop_mb:7.1f} MB (lists of boxed values)")
+    print(f"vectorized : {vectorized:6.2f}s  {arrays_mb:7.1f} MB (numpy arrays)  x{loop / vectorized:.0f}")
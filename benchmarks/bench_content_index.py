@@ -0,0 +1,92 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: "X in Content" / "Content has X" filters answered by a ContentIndex vs. scanning, on synthetic
+OpenSSH-like contents with random IPs, ports and users.
+
+Run from the repository root: `python benchmarks/bench_content_index.py --rows 2000000`
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.logparser import ContentIndex, compile_filter
+
+
+MESSAGES = np.array([
+    "Failed password for invalid user {user} from {ip} port {port} ssh2",
+    "Invalid user {user} from {ip}",
+    "Connection closed by {ip} [preauth]",
+    "pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}",
+    "Received disconnect from {ip}: 11: Bye Bye [preauth]",
+])
+
+FILTERS = [
+    "173.234.31.186 in Content",
+    "Content has 173.234.31.186",
+    "Content has 173.234.*",
+    "webmaster in Content",
+    "\"user webmaster\" in Content",
+    "Content has preauth && 173.234.31.186 in Content",
+]
+
+
+def make_contents(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ips = [f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(0, 256, size=(5000, 4))] + ['173.234.31.186']
+    users = ['root', 'admin', 'test', 'webmaster', 'oracle', 'git', 'ubuntu', 'pi']
+    return pd.Series([message.format(user=users[user], ip=ips[ip], port=port) for message, user, ip, port in zip(
+        MESSAGES[rng.integers(0, len(MESSAGES), num_rows)], rng.integers(0, len(users), num_rows),
+        rng.integers(0, len(ips), num_rows), rng.integers(1024, 65536, num_rows))], name='Content')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rows', type=int, default=2000000)
+    args = arg_parser.parse_args()
+
+    df = make_contents(args.rows).to_frame()
+    categorical_df = df.astype('category')
+    print(f"rows            : {len(df)} ({len(categorical_df['Content'].cat.categories)} distinct contents)")
+
+    start = time.perf_counter()
+    index = ContentIndex(categorical_df['Content'])
+    print(f"index build     : {time.perf_counter() - start:7.2f}s  ({len(index.vocabulary)} tokens)")
+
+    for filtering_string in FILTERS:
+        compiled_filter = compile_filter(filtering_string)
+        start = time.perf_counter()
+        expected = compiled_filter(df)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        compiled_filter(categorical_df)
+        categorical_scan = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = compiled_filter(df, indexes={'Content': index})
+        indexed = time.perf_counter() - start
+        assert (actual == expected).all(), "indexed filter differs from the scan"
+        print(f"{filtering_string:<50}: scan {scan:7.3f}s  categorical scan {categorical_scan:7.3f}s  "
+              f"index {indexed:7.3f}s  (x{scan / indexed:.0f})  {int(actual.sum())} rows")
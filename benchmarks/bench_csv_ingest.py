@@ -0,0 +1,90 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: time and peak memory of a filtered log_csv_to_df on a replicated openssh.csv, reading the whole
+file before filtering vs. filtering chunk by chunk. Every mode runs in its own process.
+
+Run from the repository root: `python benchmarks/bench_csv_ingest.py --rows 2000000`
+
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.logparser import log_csv_to_df
+
+
+SOURCE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'openssh.csv')
+
+MODES = ['whole', 'chunked', 'chunked-pyarrow']
+
+
+def replicate_csv(source, target, num_rows):
+    df = pd.read_csv(source)
+    df = pd.concat([df] * (num_rows // len(df) + 1), ignore_index=True).iloc[:num_rows]
+    df['LineId'] = range(1, len(df) + 1)
+    df.to_csv(target, index=False)
+
+
+def run_mode(mode, path, filtering_string):
+    start = time.perf_counter()
+    if mode == 'whole':
+        # Previous behaviour: the whole file is read (and converted) before the filter is applied
+        df = log_csv_to_df(path=None, df=pd.read_csv(path), filtering_string=filtering_string, year=2016)
+    else:
+        df = log_csv_to_df(path, filtering_string=filtering_string, year=2016,
+                           engine='pyarrow' if mode == 'chunked-pyarrow' else 'c')
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, peak_mb, len(df)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rows', type=int, default=2000000)
+    arg_parser.add_argument('--filter', default='Content has 173.234.31.186')
+    arg_parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    arg_parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        sys.stdout = open(os.devnull, 'w')
+        elapsed, peak_mb, rows = run_mode(args.mode, args.path, args.filter)
+        sys.stdout = sys.__stdout__
+        print(elapsed, peak_mb, rows)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'openssh_replicated.csv')
+        replicate_csv(SOURCE_CSV, csv_path, args.rows)
+        print(f"rows            : {args.rows} ({os.path.getsize(csv_path) / 2 ** 20:.0f} MB), filter: {args.filter}")
+
+        for mode in MODES:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, '--path', csv_path,
+                                     '--filter', args.filter], capture_output=True, text=True, check=True).stdout
+            elapsed, peak_mb, rows = output.split()
+            print(f"{mode:<16}: {float(elapsed):6.2f}s  peak RSS {float(peak_mb):7.0f} MB  {rows} rows kept")
@@ -0,0 +1,87 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: cluster counts and throughput of parsing with and without the benchmark_settings pre-masking pass,
+on a synthetic HDFS log and a replicated OpenSSH log.
+
+Run from the repository root: `python benchmarks/bench_masking.py --lines 200000`
+
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.parse_log import log_format_registry, parse_log_file
+
+
+SOURCE_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'OpenSSH_2k.log')
+
+HDFS_MESSAGES = [
+    "INFO dfs.DataNode$DataXceiver: Receiving block {blk} src: /{ip}:{port} dest: /{ip}:50010",
+    "INFO dfs.DataNode$PacketResponder: PacketResponder {n} for block {blk} terminating",
+    "INFO dfs.DataNode$PacketResponder: Received block {blk} of size {size} from /{ip}",
+    "INFO dfs.FSNamesystem: BLOCK* NameSystem.addStoredBlock: blockMap updated: {ip}:50010 is added to {blk} size {size}",
+    "INFO dfs.FSNamesystem: BLOCK* NameSystem.allocateBlock: /user/root/rand/_temporary/part-{n}. {blk}",
+    "INFO dfs.DataNode$DataXceiver: {ip}:50010 Served block {blk} to /{ip}",
+    "WARN dfs.DataNode$DataXceiver: {ip}:50010:Got exception while serving {blk} to /{ip}:",
+]
+
+
+def write_hdfs_log(target, num_lines, seed=0):
+    rng = random.Random(seed)
+    with open(target, 'w') as f:
+        for k in range(num_lines):
+            message = rng.choice(HDFS_MESSAGES).format(
+                blk=f"blk_{rng.choice(['', '-'])}{rng.getrandbits(62)}",
+                ip='.'.join(str(rng.randrange(256)) for _ in range(4)),
+                port=rng.randrange(1024, 65536), n=rng.randrange(3), size=rng.randrange(1 << 26))
+            f.write(f"081109 {203615 + k % 1000:06d} {rng.randrange(1, 40000)} {message}\n")
+
+
+def replicate_log(source, target, num_lines):
+    with open(source) as f:
+        lines = f.readlines()
+    with open(target, 'w') as f:
+        for k in range(num_lines):
+            f.write(lines[k % len(lines)])
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--lines', type=int, default=200000)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logs = {'HDFS': os.path.join(tmp_dir, 'HDFS.log'), 'OpenSSH': os.path.join(tmp_dir, 'OpenSSH.log')}
+        write_hdfs_log(logs['HDFS'], args.lines)
+        replicate_log(SOURCE_LOG, logs['OpenSSH'], args.lines)
+
+        for name, log_path in logs.items():
+            headers, pattern = log_format_registry.get(name)
+            for masking_regex in [None, log_format_registry.get_masking_regex(name)]:
+                start = time.perf_counter()
+                df = parse_log_file(log_path, pattern=pattern, headers=headers, masking_regex=masking_regex)
+                elapsed = time.perf_counter() - start
+                print(f"{name:<8} {'masked' if masking_regex is not None else 'raw':<7}: {elapsed:8.2f}s  "
+                      f"{len(df) / elapsed:10.0f} lines/s  {df['EventID'].nunique()} clusters")
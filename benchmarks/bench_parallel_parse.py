@@ -0,0 +1,69 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: serial vs. sharded multi-process parsing of a replicated OpenSSH log.
+
+Run from the repository root: `python benchmarks/bench_parallel_parse.py --lines 2000000`
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.parse_log import generate_logformat_regex, get_log_format, parse_log_file, parse_log_file_parallel
+
+
+SOURCE_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'OpenSSH_2k.log')
+
+
+def replicate_log(source, target, num_lines):
+    with open(source) as f:
+        lines = f.readlines()
+    with open(target, 'w') as f:
+        for k in range(num_lines):
+            f.write(lines[k % len(lines)])
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--lines', type=int, default=2000000)
+    arg_parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = arg_parser.parse_args()
+
+    headers, pattern = generate_logformat_regex(get_log_format('OpenSSH_2k.log'))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, 'OpenSSH_replicated.log')
+        replicate_log(SOURCE_LOG, log_path, args.lines)
+
+        start = time.perf_counter()
+        df = parse_log_file(log_path, pattern=pattern, headers=headers)
+        serial = time.perf_counter() - start
+        print(f"serial      : {serial:8.2f}s  {len(df) / serial:10.0f} lines/s  {df['EventID'].nunique()} events")
+
+        for n_jobs in [n for n in args.jobs if n <= os.cpu_count()]:
+            start = time.perf_counter()
+            df = parse_log_file_parallel(log_path, pattern=pattern, headers=headers, n_jobs=n_jobs)
+            elapsed = time.perf_counter() - start
+            print(f"n_jobs={n_jobs:<4} : {elapsed:8.2f}s  {len(df) / elapsed:10.0f} lines/s  "
+                  f"{df['EventID'].nunique()} events  speedup x{serial / elapsed:.1f}")
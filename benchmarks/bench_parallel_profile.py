@@ -0,0 +1,73 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: pan matrix profile of a replicated OpenSSH event series, mp.compute on one core vs. the window
+sweep spread over 1..N processes (compute_pan_profile). Every pan profile is checked against the one of
+mp.compute, with --default-windows on the window range mp.compute picks itself.
+
+Run from the repository root: `python benchmarks/bench_parallel_profile.py --length 20000 --max-window 128`
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matrixprofile as mp
+
+from gateway.logparser import log_csv_to_df
+from gateway.matrix_profile import MatrixProfileAnalyzer, compute_pan_profile
+
+
+SOURCE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'openssh.csv')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--length', type=int, default=20000)
+    arg_parser.add_argument('--min-window', type=int, default=8)
+    arg_parser.add_argument('--max-window', type=int, default=128)
+    arg_parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    arg_parser.add_argument('--default-windows', action='store_true',
+                            help="Let mp.compute and compute_pan_profile pick the windows (ignores --*-window)")
+    args = arg_parser.parse_args()
+
+    event_series = MatrixProfileAnalyzer(log_csv_to_df(SOURCE_CSV, year=2016)).event_series
+    series = np.resize(event_series, args.length)
+    windows = None if args.default_windows else list(range(args.min_window, args.max_window + 1))
+
+    start = time.perf_counter()
+    serial_profile = mp.compute(series, windows)
+    serial = time.perf_counter() - start
+    serial_windows = list(serial_profile['windows'])
+    print(f"series      : {len(series)} events, {len(serial_windows)} windows "
+          f"({serial_windows[0]}..{serial_windows[-1]}{', default' if windows is None else ''})")
+    print(f"mp.compute  : {serial:8.2f}s")
+
+    for n_jobs in [n for n in args.jobs if n <= os.cpu_count()]:
+        start = time.perf_counter()
+        profile = compute_pan_profile(series, windows, n_jobs=n_jobs)
+        elapsed = time.perf_counter() - start
+        assert list(profile['windows']) == serial_windows, "the windows differ from the ones of mp.compute"
+        assert np.allclose(profile['pmp'], serial_profile['pmp']), "the pan profile differs from the one of mp.compute"
+        print(f"n_jobs={n_jobs:<4} : {elapsed:8.2f}s  speedup x{serial / elapsed:.1f}")
@@ -0,0 +1,83 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Micro-benchmark: per-line cost of get_parameter_list_generic with and without the compiled template cache.
+
+Run from the repository root: `python benchmarks/bench_parameter_extraction.py`
+
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.parse_log import (TemplateMatcherCache, generate_logformat_regex, get_log_format,
+                               get_parameter_list_generic, parse_log_file)
+
+
+SOURCE_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'OpenSSH_2k.log')
+
+
+def uncached_get_parameter_list_generic(template, input_string):
+    # Previous implementation: rebuilds the template regex and searches the prefix for every line
+    template_regex = re.sub(r"<.{1,5}>", "PLACEHOLDER", template)
+    template_regex = re.escape(template_regex).replace("PLACEHOLDER", "(.*?)")
+    template_regex = template_regex.replace("\\ ", "[\\s_-]+")
+    template_regex = "^" + template_regex + "$"
+
+    parameters_without_preceding = []
+    parameters_with_preceding = []
+    for match_obj in re.finditer(template_regex, input_string):
+        for group_num in range(1, len(match_obj.groups()) + 1):
+            pos = match_obj.span(group_num)
+            preceding_match = re.search(r"([^\s]+)\s*$", input_string[:pos[0]])
+            preceding_chars = preceding_match.group(1) if preceding_match else ""
+            matched_value = match_obj.group(group_num)
+            parameters_without_preceding.append(matched_value)
+            parameters_with_preceding.append(preceding_chars + matched_value)
+    return parameters_without_preceding, parameters_with_preceding
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--repeat', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    headers, pattern = generate_logformat_regex(get_log_format('OpenSSH_2k.log'))
+    df = parse_log_file(SOURCE_LOG, pattern=pattern, headers=headers)
+
+    rows = list(zip(df['EventID'], df['EventTemplate'], df['Content'])) * args.repeat
+
+    start = time.perf_counter()
+    expected = [uncached_get_parameter_list_generic(template, content) for _, template, content in rows]
+    uncached = time.perf_counter() - start
+
+    cache = TemplateMatcherCache()
+    start = time.perf_counter()
+    actual = [get_parameter_list_generic(template, content, template_regex=cache.get(cluster_id, template))
+              for cluster_id, template, content in rows]
+    cached = time.perf_counter() - start
+
+    assert actual == expected, "cached extraction differs from the uncached one"
+    print(f"lines           : {len(rows)} ({len(cache)} compiled templates)")
+    print(f"uncached        : {uncached / len(rows) * 1e6:6.2f} us/line")
+    print(f"cached          : {cached / len(rows) * 1e6:6.2f} us/line  (x{uncached / cached:.1f})")
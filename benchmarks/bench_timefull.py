@@ -0,0 +1,78 @@
+#  Copyright 2024 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+
+Benchmark: per-row vs. vectorized construction of TimeFull on a replicated openssh.csv.
+
+Run from the repository root: `python benchmarks/bench_timefull.py --rows 1000000`
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway.logparser import get_time_full
+
+
+SOURCE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_logs', 'openssh.csv')
+
+
+def loop_time_full(df, year):
+    # Previous implementation: formats and parses one string per row
+    month_dict = {'Jan': '1', 'Feb': '2', 'Mar': '3', 'Apr': '4', 'May': '5', 'Jun': '6', 'Jul': '7', 'Aug': '8', 'Sep': '9', 'Oct': '10', 'Nov': '11', 'Dec': '12'}
+    time_full = []
+    for idx, entry in enumerate(df['Date']):
+        date_full = f"{df['Day'][idx]}-{month_dict[entry]}-{year}"
+        time_full.append(pd.to_datetime(date_full + ' ' + df['Time'][idx], format='%d-%m-%Y %H:%M:%S'))
+    return pd.Series(time_full)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rows', type=int, default=1000000)
+    arg_parser.add_argument('--loop-rows', type=int, default=None,
+                            help='time the per-row loop on this many rows only and extrapolate')
+    args = arg_parser.parse_args()
+
+    source = pd.read_csv(SOURCE_CSV)
+    df = pd.concat([source] * (args.rows // len(source) + 1), ignore_index=True).iloc[:args.rows]
+    loop_rows = min(args.loop_rows or args.rows, args.rows)
+
+    start = time.perf_counter()
+    expected = loop_time_full(df.iloc[:loop_rows], 2016)
+    loop = (time.perf_counter() - start) * args.rows / loop_rows
+
+    start = time.perf_counter()
+    actual = get_time_full(df, year=2016)
+    vectorized = time.perf_counter() - start
+
+    categorical = df[['Date', 'Day', 'Time']].astype('category')
+    start = time.perf_counter()
+    get_time_full(categorical, year=2016)
+    vectorized_categorical = time.perf_counter() - start
+
+    assert (actual.iloc[:loop_rows].to_numpy() == expected.to_numpy()).all(), "vectorized TimeFull differs from the loop"
+    print(f"rows                   : {args.rows}" + (f" (loop timed on {loop_rows})" if loop_rows < args.rows else ""))
+    print(f"per-row loop           : {loop:8.2f}s")
+    print(f"vectorized             : {vectorized:8.2f}s  (x{loop / vectorized:.0f})")
+    print(f"vectorized, categorical: {vectorized_categorical:8.2f}s  (x{loop / vectorized_categorical:.0f})")
@@ -27,6 +27,8 @@ This dictionary is stored in `st.session_state.demo_state`
 INITIAL_STATE =  {
     "api_key" : "<YOUR-API-KEY-HERE", 
     "dump_folder" : "file_dump/",
+    "profile_cache_folder" : "profile_cache/", 
+    "profile_cache_max_mb" : 512, 
 
     "selected_file" : None, 
     "selected_file_path" : None, 
@@ -35,7 +37,11 @@ INITIAL_STATE =  {
     "comps_to_see" : [], 
 
     "df" : None, 
+    "df_full" : None, 
+    "content_index" : None, 
+    "indexed_file" : None, 
     "mpa" : None, 
+    "raw_log" : None, 
 
     "profileDiscords" : None, 
     "discords" : [], 
@@ -26,12 +26,24 @@ This file contains:
 import streamlit as st
 import os 
 
-from gateway.logparser import log_csv_to_df
-from gateway.matrix_profile import MatrixProfileAnalyzer
-from gateway.parse_log import parse_log_file_from_file
+from gateway.logparser import compile_filter, filter_df, log_csv_to_df, ContentIndex
+from gateway.matrix_profile import MatrixProfileAnalyzer, ProfileCache
+from gateway.parse_log import parse_log_file_from_file, strip_compression_extension, COMPRESSION_EXTENSIONS, \
+    get_compression, RawLogReader
 
 def get_file_extension(file_path):
-    return os.path.splitext(file_path)[1]
+    # Compressed logs are typed by their inner extension, e.g. ".log" for "OpenSSH_2k.log.gz"
+    return os.path.splitext(strip_compression_extension(file_path))[1]
+
+def get_filter_error(filtering_string):
+    # Syntax errors of the filter, checked before parsing the log
+    if not filtering_string:
+        return None
+    try:
+        compile_filter(filtering_string)
+    except ValueError as e:
+        return str(e)
+    return None
 
 def colL(): 
     st.title("Log with LION 🦁🥳")
@@ -40,7 +52,7 @@ def colL():
     """ Section 1: File Upload """
 
     # TODO: support file types beyond csv (currently only rigorously tested w/ openssh.csv)
-    st.session_state.demo_state['selected_file'] = st.file_uploader("Upload a Log File (Current support: .txt, .csv, .log)", type=["txt", "csv", "log"])
+    st.session_state.demo_state['selected_file'] = st.file_uploader("Upload a Log File (Current support: .txt, .csv, .log, optionally compressed)", type=["txt", "csv", "log"] + [extension[1:] for extension in COMPRESSION_EXTENSIONS])
 
     if st.session_state.demo_state['selected_file']:
         os.makedirs(st.session_state.demo_state['dump_folder'], exist_ok=True)
@@ -84,22 +96,46 @@ def colL():
 
         if not st.session_state.demo_state['selected_file'] or not st.session_state.demo_state['selected_file_path']: 
             st.warning('No log file has been selected. Please upload, and try again!', icon="⚠️")
+
+        elif (filter_error := get_filter_error(st.session_state.demo_state['filtering_string'])):
+            st.warning(f"Invalid filter: {filter_error}", icon="⚠️")
         
         else: 
             # First, we convert the log file into a dataframe 
             with st.spinner("Putting log into DF..."):
-                extension = get_file_extension(st.session_state.demo_state['selected_file_path'])
-                if extension == ".log":
-                    
-                    df = parse_log_file_from_file(st.session_state.demo_state['selected_file_path'],delimiter=';',outdir='.',indir=os.getcwd() + '/',save_file=False)
-                    st.session_state.demo_state['df'] = log_csv_to_df(path=None, filtering_string=st.session_state.demo_state['filtering_string'],df=df)
-                    
-                elif extension == ".csv":
-                    st.session_state.demo_state['df'] = log_csv_to_df(st.session_state.demo_state['selected_file_path'], filtering_string=st.session_state.demo_state['filtering_string'])
+                try:
+                    # The unfiltered log and its Content index are built once per file, filters only reuse them
+                    if st.session_state.demo_state['indexed_file'] != st.session_state.demo_state['selected_file_path']:
+                        extension = get_file_extension(st.session_state.demo_state['selected_file_path'])
+                        st.session_state.demo_state['raw_log'] = None
+                        if extension == ".log":
+                        
+                            # Raw lines of plain logs are only indexed, and read back for the discord/motif entries shown
+                            if get_compression(st.session_state.demo_state['selected_file_path']) is None:
+                                st.session_state.demo_state['raw_log'] = RawLogReader(st.session_state.demo_state['selected_file_path'])
+                            df = parse_log_file_from_file(st.session_state.demo_state['selected_file_path'],delimiter=';',outdir='.',indir=os.getcwd() + '/',save_file=False,store_original_log=st.session_state.demo_state['raw_log'] is None)
+                            df = log_csv_to_df(path=None, df=df)
+                        
+                        elif extension == ".csv":
+                            df = log_csv_to_df(st.session_state.demo_state['selected_file_path'])
+
+                        st.session_state.demo_state['df_full'] = df
+                        st.session_state.demo_state['content_index'] = ContentIndex(df['Content'])
+                        st.session_state.demo_state['indexed_file'] = st.session_state.demo_state['selected_file_path']
+
+                    st.session_state.demo_state['df'] = st.session_state.demo_state['df_full']
+                    if st.session_state.demo_state['filtering_string']:
+                        st.session_state.demo_state['df'] = filter_df(st.session_state.demo_state['df_full'], st.session_state.demo_state['filtering_string'], content_index=st.session_state.demo_state['content_index'])
+                except ValueError as e:
+                    # e.g. the filter refers to a column the log doesn't have
+                    st.warning(f"Invalid filter: {e}", icon="⚠️")
+                    st.stop()
 
             # Next, we initialize our Matrix Profile analyzer
             with st.spinner("Running Matrix Profile..."):
-                st.session_state.demo_state['mpa'] = MatrixProfileAnalyzer(st.session_state.demo_state['df'])
+                # Profiles of a log analyzed before (e.g. on a rerun) are loaded from disk
+                profile_cache = ProfileCache(st.session_state.demo_state['profile_cache_folder'], max_bytes=st.session_state.demo_state['profile_cache_max_mb'] * 2 ** 20)
+                st.session_state.demo_state['mpa'] = MatrixProfileAnalyzer(st.session_state.demo_state['df'], raw_log=st.session_state.demo_state['raw_log'], profile_cache=profile_cache)
 
 
             # If we're not filtering (showing subset of log), then: 
@@ -142,5 +178,5 @@ def colL():
     st.subheader("Filter using Specific Variables 🔍")
 
     st.caption("Upon inspection of discords and motifs, feel free to view a filtered version of the log file.")
-    st.session_state.demo_state['filtering_string'] = st.text_input(label="Enter any variables, keywords, addresses, and more (boolean operators supported!)", placeholder="Ex. 173.234.31.186 in Content || Pid==24,200")
+    st.session_state.demo_state['filtering_string'] = st.text_input(label="Enter any variables, keywords, addresses, and more (boolean operators supported!)", placeholder="Ex. Content has 173.234.31.186 || Pid==24,200")
     st.caption("Simply press 'Analyze Log File' or empty the text input to remove filtering")
\ No newline at end of file
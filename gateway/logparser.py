@@ -19,16 +19,553 @@
 
 This file contains: 
 
-- def get_df_mask_from_filtering_string(df, filtering_string)
-- def log_csv_to_df(path, filtering_string=None)
+- def tokenize_filter(filtering_string)
+- class ContentIndex()
+- class CompiledFilter()
+- def compile_filter(filtering_string)
+- def get_df_mask_from_filtering_string(df, filtering_string, content_index=None)
+- def filter_df(df, filtering_string, content_index=None)
+- def parse_time(value)
+- def get_time_full(df, year=None, reference_time=None, rollovers=None)
+- def get_csv_columns(path)
+- def iter_log_csv_chunks(path, chunk_size=CSV_CHUNK_SIZE, usecols=None, engine='c')
+- def log_csv_to_df(path, filtering_string=None, df=None, content_index=None, year=None, chunk_size=CSV_CHUNK_SIZE,
+    usecols=None, engine='c')
 
 """
 
+import csv
+import io
+import numpy as np
+import os
 import pandas as pd 
 import re 
 
+from gateway.parse_log import (compact_parsed_log, concat_parsed_logs, get_year_rollovers, infer_first_year,
+                               open_log_file)
 
-def get_df_mask_from_filtering_string(df, filtering_string): 
+
+FILTER_TOKEN_REGEX = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<operator>\|\||&&|==|!=|<=|>=|[|&!()<>,=])
+      | (?P<word>[^\s"'|&!()<>=,]+(?:=(?![=\s])[^\s"'|&!()<>=,]+)*)
+    )""", re.VERBOSE)
+
+# Single-character forms of the boolean operators, kept for filters written before they were doubled. A
+# single '=' inside a word (e.g. rhost=1.2.3.4) is part of the word, only a '=' starting a token is '=='
+FILTER_OPERATOR_ALIASES = {'|': '||', '&': '&&', '=': '=='}
+
+FILTER_COMPARISONS = {'<': np.less, '>': np.greater, '<=': np.less_equal, '>=': np.greater_equal}
+
+# Formats of the times written by users (filters, time slices), day first like TimeFull, tried in order
+TIME_FORMATS = ['%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M', '%d-%m-%Y']
+
+# Types of the columns of parsed log csv files (see gateway.parse_log), other columns are inferred
+CSV_COLUMN_DTYPES = {
+    'LineId': 'int64', 'Date': 'category', 'Day': 'int64', 'Time': 'category', 'Component': 'category',
+    'Content': 'category', 'EventId': 'category', 'EventTemplate': 'category',
+}
+
+CSV_CHUNK_SIZE = 200000
+
+MONTH_NUMBERS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+
+def tokenize_filter(filtering_string): 
+
+    """
+    Splits a filtering string into (kind, text, position) tokens.
+
+    Parameters:
+    filtering_string (str): The filtering string, see compile_filter.
+
+    Returns:
+    list: Tuples of the token kind ('string', 'operator' or 'word'), its text (unquoted for strings)
+        and its position in filtering_string.
+
+    Raises:
+    ValueError: If filtering_string contains an unterminated quote.
+
+    Example:
+    >>> tokenize_filter('Pid==24,200')
+    [('word', 'Pid', 0), ('operator', '==', 3), ('word', '24', 5), ('operator', ',', 7), ('word', '200', 8)]
+    >>> tokenize_filter('rhost=1.2.3.4 in Content')
+    [('word', 'rhost=1.2.3.4', 0), ('word', 'in', 14), ('word', 'Content', 17)]
+
+    """
+
+    tokens = []
+    position = 0
+    while position < len(filtering_string):
+        match = FILTER_TOKEN_REGEX.match(filtering_string, position)
+        if match is None or match.lastgroup is None:
+            if filtering_string[position:].strip():
+                raise ValueError(f"Unterminated quote at position {position} of the filter")
+            break
+        kind, text = match.lastgroup, match.group(match.lastgroup)
+        if kind == 'string':
+            text = re.sub(r'\\(.)', r'\1', text[1:-1])
+        elif kind == 'operator':
+            text = FILTER_OPERATOR_ALIASES.get(text, text)
+        tokens.append((kind, text, match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+class _FilterParser: 
+
+    # Recursive descent over the grammar below, in increasing order of precedence, nodes are hashable tuples:
+    #   expression := conjunction ('||' conjunction)*                    -> ('or', children)
+    #   conjunction := negation ('&&' negation)*                         -> ('and', children)
+    #   negation   := '!' negation | '(' expression ')' | condition      -> ('not', child)
+    #   condition  := value 'in' column                                  -> ('contains', column, value)
+    #               | column 'matches' value                             -> ('matches', column, pattern)
+    #               | column 'has' value                                 -> ('has', column, token or prefix*)
+    #               | column ('=='|'!=') value (',' value)*              -> ('isin', column, values)
+    #               | column ('<'|'>'|'<='|'>=') value                   -> ('compare', column, operator, value)
+    #               | column 'between' value ',' value                   -> ('between', column, low, high)
+    #               | column 'around' value ',' value                    -> ('around', column, center, radius)
+
+    def __init__(self, filtering_string):
+        self.filtering_string = filtering_string
+        self.tokens = tokenize_filter(filtering_string)
+        self.position = 0
+
+    def _peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None, len(self.filtering_string))
+
+    def _error(self, message, token=None):
+        position = (token or self._peek())[2]
+        return ValueError(f"{message} at position {position} of the filter: {self.filtering_string}")
+
+    def _accept(self, *texts):
+        kind, text, _ = self._peek()
+        if kind == 'operator' and text in texts:
+            self.position += 1
+            return text
+        return None
+
+    def _value(self, what):
+        token = self._peek()
+        if token[0] not in ('string', 'word'):
+            raise self._error(f"Expected {what}", token)
+        self.position += 1
+        return token[1]
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("The filter is empty")
+        node = self._expression()
+        if self.position < len(self.tokens):
+            raise self._error(f"Unexpected '{self._peek()[1]}'")
+        return node
+
+    def _chain(self, kind, operator, parse_operand):
+        children = [parse_operand()]
+        while self._accept(operator):
+            children.append(parse_operand())
+        # Flatten nested chains of the same operator and drop repeated operands
+        flattened = []
+        for child in children:
+            for operand in (child[1] if child[0] == kind else (child,)):
+                if operand not in flattened:
+                    flattened.append(operand)
+        return flattened[0] if len(flattened) == 1 else (kind, tuple(flattened))
+
+    def _expression(self):
+        return self._chain('or', '||', self._conjunction)
+
+    def _conjunction(self):
+        return self._chain('and', '&&', self._negation)
+
+    def _negation(self):
+        if self._accept('!'):
+            child = self._negation()
+            return child[1] if child[0] == 'not' else ('not', child)
+        if self._accept('('):
+            node = self._expression()
+            if not self._accept(')'):
+                raise self._error("Expected ')'")
+            return node
+        return self._condition()
+
+    def _condition(self):
+        left = self._value("a value or a column")
+        kind, text, _ = self._peek()
+        if kind == 'word' and text == 'in':
+            self.position += 1
+            return ('contains', self._value("a column after 'in'"), left)
+        if kind == 'word' and text == 'has':
+            self.position += 1
+            token = self._value("a token after 'has'")
+            if not CONTENT_TOKEN_REGEX.fullmatch(token.rstrip('*')) or '*' in token.rstrip('*'):
+                raise self._error(f"'{token}' is not a token (or a token prefix ending with *)")
+            return ('has', left, token)
+        if kind == 'word' and text == 'matches':
+            self.position += 1
+            pattern = self._value("a regular expression after 'matches'")
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise self._error(f"Invalid regular expression '{pattern}' ({e})")
+            return ('matches', left, pattern)
+        if kind == 'word' and text in ('between', 'around'):
+            self.position += 1
+            first = self._value(f"a value after '{text}'")
+            if not self._accept(','):
+                raise self._error(f"'{text}' takes two values separated by ','")
+            return (text, left, first, self._value("a value after ','"))
+
+        operator = self._accept('==', '!=', '<', '>', '<=', '>=')
+        if operator is None:
+            hint = " (use '==' to compare, a '=' inside a word is part of the value)" if '=' in left else ""
+            raise self._error(f"Expected 'in', 'has', 'matches', 'between', 'around' or a comparison after "
+                              f"'{left}'{hint}")
+        values = [self._value(f"a value after '{operator}'")]
+        while self._accept(','):
+            values.append(self._value("a value after ','"))
+        if operator in ('==', '!='):
+            node = ('isin', left, tuple(dict.fromkeys(values)))
+            return node if operator == '==' else ('not', node)
+        if len(values) > 1:
+            raise self._error(f"'{operator}' takes a single value")
+        return ('compare', left, operator, values[0])
+
+
+def _get_filter_cost(node): 
+
+    # Rough relative cost of evaluating a node: substring and regex searches dominate
+    kind = node[0]
+    if kind in ('or', 'and'):
+        return max(_get_filter_cost(child) for child in node[1])
+    if kind == 'not':
+        return _get_filter_cost(node[1])
+    return {'compare': 0, 'isin': 0, 'between': 0, 'around': 0, 'contains': 1, 'has': 1, 'matches': 2}[kind]
+
+
+def _convert_filter_value(column, dtype, value): 
+
+    # Types a literal of the filter like the values of the column it is compared with
+    try:
+        if pd.api.types.is_bool_dtype(dtype):
+            if value.lower() not in ('true', 'false'):
+                raise ValueError
+            return value.lower() == 'true'
+        if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
+            number = float(value)
+            return int(number) if number.is_integer() else number
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return parse_time(value)
+    except ValueError:
+        raise ValueError(f"Can't compare column '{column}' ({dtype}) with '{value}'") from None
+    return value
+
+
+def _get_filter_range(column, dtype, kind, first, second): 
+
+    # Inclusive bounds of a 'between' (low, high) or 'around' (center, radius) condition, the radius of a
+    # datetime column is a duration such as 5min or '1h 30min'
+    if kind == 'between':
+        return _convert_filter_value(column, dtype, first), _convert_filter_value(column, dtype, second)
+    center = _convert_filter_value(column, dtype, first)
+    try:
+        radius = pd.Timedelta(second) if pd.api.types.is_datetime64_any_dtype(dtype) else float(second)
+    except ValueError:
+        raise ValueError(f"Invalid radius '{second}' for column '{column}' ({dtype})") from None
+    return center - radius, center + radius
+
+
+# Characters of the tokens of ContentIndex: IPs, host names, user names, numbers, ... are single tokens
+CONTENT_TOKEN_CHARS = r'\w.@-'
+
+CONTENT_TOKEN_REGEX = re.compile(f'[{CONTENT_TOKEN_CHARS}]+')
+
+
+class ContentIndex: 
+
+    """
+    An inverted index from the tokens of a text column (by default Content) to the rows containing them.
+
+    Tokens are the maximal runs of word characters, dots, dashes and @ (so "rhost=173.234.31.186" has the
+    tokens "rhost" and "173.234.31.186"). Only the distinct values of the column are tokenized, and rows
+    are grouped by value, so the row ids of a token are gathered from the groups of the values containing
+    it and queries don't touch the other rows. The vocabulary is sorted, so prefix queries are a binary
+    search. The index is positional: it only applies to the DataFrame it was built from, in the same order.
+
+    Parameters:
+    series (pd.Series): The column to index, categorical or strings.
+
+    Example:
+    >>> index = ContentIndex(df['Content'])
+    >>> rows = index.rows_with_token('173.234.31.186')
+    >>> rows = index.rows_with_token_prefix('173.234.')
+    >>> mask = compile_filter("Content has 173.234.31.186 || webmaster in Content")(df, indexes={'Content': index})
+
+    """
+
+    def __init__(self, series):
+        self.column = series.name
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, values = pd.factorize(series)
+        self.values = pd.Series(values, dtype=str)
+        self._codes = codes
+
+        # Row ids grouped by value, in increasing order within each group (missing values sort first)
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        self._rows = np.argsort(codes, kind='stable')[len(codes) - counts.sum():]
+        self._row_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # Value ids grouped by token, over the sorted vocabulary
+        pairs = self.values.str.findall(CONTENT_TOKEN_REGEX.pattern).explode().dropna()
+        pairs = pd.DataFrame({'token': pairs.to_numpy(dtype=object), 'value': pairs.index}).drop_duplicates()
+        token_codes, vocabulary = pd.factorize(pairs['token'], sort=True)
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self._token_values = pairs['value'].to_numpy()[np.argsort(token_codes, kind='stable')]
+        self._token_offsets = np.concatenate([[0], np.cumsum(np.bincount(token_codes, minlength=len(vocabulary)))])
+
+    def __len__(self):
+        return len(self._codes)
+
+    @staticmethod
+    def _gather(ids, offsets, grouped):
+        # Concatenation of the groups of ids, without a Python loop over them
+        ids = np.asarray(ids, dtype=np.int64)
+        starts, lengths = offsets[ids], offsets[ids + 1] - offsets[ids]
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - lengths), lengths)
+        return grouped[positions]
+
+    def _token_range(self, prefix):
+        start = np.searchsorted(self.vocabulary, prefix, side='left')
+        end = np.searchsorted(self.vocabulary, prefix + '\U0010ffff', side='left')
+        return np.arange(start, end)
+
+    def _values_with_tokens(self, token_ids):
+        return np.unique(self._gather(token_ids, self._token_offsets, self._token_values))
+
+    def _values_containing(self, substring):
+        # A substring made of token characters lies within a single token, so only the vocabulary is
+        # searched, any other substring is searched in the distinct values
+        if CONTENT_TOKEN_REGEX.fullmatch(substring):
+            vocabulary = pd.Series(self.vocabulary, dtype=str)
+            token_ids = np.flatnonzero(vocabulary.str.contains(substring, regex=False).to_numpy(dtype=bool))
+            return self._values_with_tokens(token_ids)
+        return np.flatnonzero(self.values.str.contains(substring, regex=False, na=False).to_numpy(dtype=bool))
+
+    def _get_value_ids(self, kind, needle):
+        if kind == 'contains':
+            return self._values_containing(needle)
+        if needle.endswith('*'):
+            return self._values_with_tokens(self._token_range(needle[:-1]))
+        token_id = np.searchsorted(self.vocabulary, needle)
+        found = token_id < len(self.vocabulary) and self.vocabulary[token_id] == needle
+        return self._values_with_tokens([token_id] if found else [])
+
+    def _rows_of_values(self, value_ids):
+        return np.sort(self._gather(value_ids, self._row_offsets, self._rows))
+
+    def rows_with_token(self, token):
+        """ Returns the sorted ids of the rows having token """
+        return self._rows_of_values(self._get_value_ids('has', token))
+
+    def rows_with_token_prefix(self, prefix):
+        """ Returns the sorted ids of the rows having a token starting with prefix """
+        return self._rows_of_values(self._get_value_ids('has', prefix + '*'))
+
+    def rows_containing(self, substring):
+        """ Returns the sorted ids of the rows containing substring """
+        return self._rows_of_values(self._get_value_ids('contains', substring))
+
+    def get_mask(self, kind, needle):
+        """ Returns the Boolean mask of the rows matching a 'has' (token, or token prefix ending with *)
+            or 'contains' (substring) condition
+        """
+        value_ids = self._get_value_ids(kind, needle)
+        num_rows = (self._row_offsets[value_ids + 1] - self._row_offsets[value_ids]).sum()
+        if num_rows < len(self) // 16:
+            # Few rows: set them from their row ids
+            mask = np.zeros(len(self), dtype=bool)
+            mask[self._gather(value_ids, self._row_offsets, self._rows)] = True
+            return mask
+        value_mask = np.zeros(len(self.values) + 1, dtype=bool)
+        value_mask[value_ids] = True
+        return value_mask[self._codes]
+
+
+class CompiledFilter: 
+
+    """
+    A filtering string parsed into an AST, evaluated into a vectorized Boolean mask.
+
+    Conditions on categorical columns are evaluated once per category and expanded through the
+    category codes, `in` is a literal substring test (use `matches` for regular expressions), and
+    conditions repeated in the filter are only evaluated once per DataFrame. Operands of `&&` and `||`
+    are evaluated cheapest first (comparisons before substring searches), each on the rows the
+    previous ones left undecided. `in` and `has` conditions on a column with a ContentIndex are
+    answered by the index.
+
+    Parameters:
+    filtering_string (str): The filtering string, see compile_filter.
+
+    Raises:
+    ValueError: If filtering_string is not a valid filter.
+
+    Example:
+    >>> compiled_filter = CompiledFilter("173.234.31.186 in Content && !(Pid == 24200)")
+    >>> compiled_filter.columns
+    ['Content', 'Pid']
+    >>> filtered_df = df[compiled_filter(df)]
+
+    """
+
+    def __init__(self, filtering_string):
+        self.filtering_string = filtering_string
+        self.tree = _FilterParser(filtering_string).parse()
+
+    @property
+    def columns(self):
+        columns = []
+        def visit(node):
+            if node[0] in ('or', 'and'):
+                for child in node[1]:
+                    visit(child)
+            elif node[0] == 'not':
+                visit(node[1])
+            elif node[1] not in columns:
+                columns.append(node[1])
+        visit(self.tree)
+        return columns
+
+    def __call__(self, df, indexes=None):
+        """ Returns the Boolean mask of df, indexes maps column names to ContentIndexes of df
+        """
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Unknown column(s) {missing} in the filter, available columns: {list(df.columns)}")
+        indexes = indexes or {}
+        for column, index in indexes.items():
+            if len(index) != len(df):
+                raise ValueError(f"The index of column '{column}' was built for a different DataFrame")
+        return pd.Series(self._evaluate(self.tree, df, {}, indexes=indexes), index=df.index)
+
+    def _evaluate(self, node, df, cache, rows=None, indexes=None):
+        # Mask of node over all rows of df, or over the row positions in rows only. Only masks over all
+        # rows are cached, so shared subexpressions are evaluated once
+        if node in cache:
+            return cache[node] if rows is None else cache[node][rows]
+
+        kind = node[0]
+        if kind in ('or', 'and'):
+            # Cheap operands first, the next ones only look at the rows the previous ones left undecided
+            mask = np.full(len(df) if rows is None else len(rows), kind == 'and')
+            for child in sorted(node[1], key=_get_filter_cost):
+                num_true = np.count_nonzero(mask)
+                num_undecided = num_true if kind == 'and' else len(mask) - num_true
+                if num_undecided == 0:
+                    break
+                if num_undecided > len(mask) // 2:
+                    if kind == 'or':
+                        mask |= self._evaluate(child, df, cache, rows, indexes)
+                    else:
+                        mask &= self._evaluate(child, df, cache, rows, indexes)
+                else:
+                    selected = np.flatnonzero(mask) if kind == 'and' else np.flatnonzero(~mask)
+                    mask[selected] = self._evaluate(child, df, cache, selected if rows is None else rows[selected],
+                                                    indexes)
+        elif kind == 'not':
+            mask = ~self._evaluate(node[1], df, cache, rows, indexes)
+        elif kind in ('contains', 'has') and indexes and node[1] in indexes:
+            # The index answers for all rows at once, the full mask is cached
+            mask = indexes[node[1]].get_mask(kind, node[2])
+            cache[node] = mask
+            return mask if rows is None else mask[rows]
+        else:
+            series = df[node[1]]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Evaluate on the categories only, missing values (code -1) pick the trailing False
+                categories = pd.Series(series.cat.categories)
+                category_mask = np.append(self._evaluate_condition(node, categories), False)
+                codes = series.cat.codes.to_numpy()
+                mask = category_mask[codes if rows is None else codes[rows]]
+            else:
+                mask = self._evaluate_condition(node, series if rows is None else series.iloc[rows])
+
+        if rows is None:
+            cache[node] = mask
+        return mask
+
+    @staticmethod
+    def _evaluate_condition(node, series):
+        kind, column = node[0], node[1]
+        if kind in ('contains', 'matches', 'has'):
+            strings = series if pd.api.types.is_string_dtype(series.dtype) else series.astype(str)
+            pattern, regex = node[2], kind == 'matches'
+            if kind == 'has':
+                # Without an index: the token (or prefix) surrounded by non-token characters
+                boundary = f'(?:^|[^{CONTENT_TOKEN_CHARS}])'
+                pattern, regex = boundary + re.escape(pattern.rstrip('*')), True
+                if not node[2].endswith('*'):
+                    pattern += f'(?:$|[^{CONTENT_TOKEN_CHARS}])'
+            if not regex and getattr(strings.dtype, 'storage', None) == 'pyarrow':
+                # pyarrow's regex kernel beats its literal substring kernel, the escaped needle matches literally
+                pattern, regex = re.escape(pattern), True
+            return strings.str.contains(pattern, regex=regex, na=False).to_numpy(dtype=bool)
+        if kind == 'isin':
+            values = [_convert_filter_value(column, series.dtype, value) for value in node[2]]
+            mask = series == values[0] if len(values) == 1 else series.isin(values)
+            return mask.to_numpy(dtype=bool, na_value=False)
+
+        if kind in ('between', 'around'):
+            low, high = _get_filter_range(column, series.dtype, kind, node[2], node[3])
+            try:
+                return ((series >= low) & (series <= high)).to_numpy(dtype=bool, na_value=False)
+            except TypeError:
+                raise ValueError(f"Can't compare column '{column}' ({series.dtype}) with '{node[2]}'") from None
+
+        value = _convert_filter_value(column, series.dtype, node[3])
+        try:
+            return FILTER_COMPARISONS[node[2]](series, value).fillna(False).to_numpy(dtype=bool)
+        except TypeError:
+            raise ValueError(f"Can't compare column '{column}' ({series.dtype}) with '{node[3]}'") from None
+
+
+def compile_filter(filtering_string): 
+
+    """
+    Compiles a filtering string into a reusable CompiledFilter.
+
+    Conditions are `value in Column` (literal substring), `Column has token` (whole token, see ContentIndex,
+    or token prefix with `Column has prefix*`), `Column matches regex`, `Column == a,b,...`
+    (any of the values), `Column != a,b,...`, `Column < value` (also >, <=, >=), `Column between low,high` and
+    `Column around center,radius` (both inclusive, the radius of TimeFull is a duration such as 5min, e.g.
+    `TimeFull around '10-12-2016 09:00:00',5min` for the 10 minutes around an incident). They are combined with
+    `!`, `&&` and `||` (in decreasing order of precedence) and parentheses. Values and column names
+    containing spaces or operator characters are quoted with "..." or '...'. Values are converted to the
+    type of the column they are compared with.
+
+    Parameters:
+    filtering_string (str): A string containing boolean expressions involving column titles.
+        Examples: "172.192.18.23 in Content || Pid == 24287", "(Pid==24,200 || LineId > 120) && !'[preauth]' in Content".
+
+    Returns:
+    CompiledFilter: Callable returning the Boolean mask of a DataFrame.
+
+    Raises:
+    ValueError: If filtering_string is not a valid filter.
+
+    Example:
+    >>> mask = compile_filter("LineId > 120 && LineId < 160 || Pid == 24287")(df)
+
+    """
+
+    return CompiledFilter(filtering_string)
+
+
+def get_df_mask_from_filtering_string(df, filtering_string, content_index=None): 
 
     """
     Filter rows in a DataFrame based on boolean expressions involving column titles.
@@ -36,16 +573,22 @@ def get_df_mask_from_filtering_string(df, filtering_string):
     This function takes a DataFrame and a filtering string containing boolean expressions
     involving the DataFrame's column titles and returns a Boolean mask that can be used
     to filter rows that satisfy the conditions specified in the filtering string.
+    The filtering string is parsed by compile_filter, which documents the supported syntax.
 
     Parameters:
     df (pd.DataFrame): The input DataFrame.
     filtering_string (str): A string containing boolean expressions involving column titles.
         Examples: "172.192.18.23 in Content || Pid == 24287", "LineId > 120 && LineId < 160".
+    content_index (ContentIndex, optional): An index of a text column of df, used for its `in` and
+        `has` conditions. Default is None.
 
     Returns:
     pd.Series: A Boolean mask with the same index as the DataFrame, indicating which rows
         satisfy the conditions in the filtering string.
 
+    Raises:
+    ValueError: If the filtering string is invalid or refers to unknown columns.
+
     Example:
     >>> import pandas as pd
     >>> data = {'LineId': [100, 150, 130, 140, 160],
@@ -60,64 +603,246 @@ def get_df_mask_from_filtering_string(df, filtering_string):
     0     100  24287       A
     1     150  24287       B
     2     130  12345       C
+    3     140  56789       D
 
     """
 
-    filter_string = filtering_string.replace("||", "|").replace("&&", "&")
-    print(f"(logparser.py) Inputted filtering string: {filter_string}")
-    
-    filter_string = re.sub(r'\|\|', '|', filter_string)
-    filter_string = re.sub(r'&&', '&', filter_string)
-
-    mask = pd.Series(False, index=df.index)
-    first_time = True 
-
-    # Go through each boolean condition inputted 
-    for condition in re.split(r'\||&', filter_string):
-        condition = condition.strip()
-
-        in_pattern = r'(\S+)\s+in\s+(\S+)'
-        eq_pattern = r'\s*(\S+)\s*==\s*(\S+)\s*'
-        gr_pattern = r'\s*(\S+)\s*<\s*(\S+)\s*'
-        lt_pattern = r'\s*(\S+)\s*>\s*(\S+)\s*'
-
-        operator = [] 
-
-        # Currently, only `in` and `==` are suppored 
-        if re.match(in_pattern, condition):
-            match = re.match(in_pattern, condition)
-            operator = "in"
-        elif re.match(eq_pattern, condition):
-            match = re.match(eq_pattern, condition)
-            operator = "=="
-        elif re.match(gr_pattern, condition):
-            match = re.match(gr_pattern, condition)
-            operator = "<"
-        elif re.match(lt_pattern, condition):
-            match = re.match(lt_pattern, condition)
-            operator = ">"
-        else:
-            break 
-
-        # Defining the two possible condition formats
-        if operator == "in": 
-            cond_mask = f"df['{match.group(2)}'].str.contains('{str(match.group(1))}')"
-        else: 
-            cond_mask = f"df['{match.group(1)}'] {operator} {match.group(2)}"
-
-        # Either and-ing or or-ing to df mask 
-        if '&' in filter_string and not first_time:
-            mask &= eval(cond_mask)
-            first_time = False
+    print(f"(logparser.py) Inputted filtering string: {filtering_string}")
+    indexes = {content_index.column: content_index} if content_index is not None else None
+    return compile_filter(filtering_string)(df, indexes=indexes)
+
+
+
+def filter_df(df, filtering_string, content_index=None): 
+
+    """
+    Returns the rows of a DataFrame satisfying a filtering string, with unused categories removed.
+
+    Parameters:
+    df (pd.DataFrame): The input DataFrame.
+    filtering_string (str): A string containing boolean expressions involving column titles,
+        see compile_filter.
+    content_index (ContentIndex, optional): An index of a text column of df. Default is None.
+
+    Returns:
+    pd.DataFrame: The filtered DataFrame.
+
+    Raises:
+    ValueError: If the filtering string is invalid or refers to unknown columns.
+
+    Example:
+    >>> content_index = ContentIndex(df['Content'])
+    >>> filtered_df = filter_df(df, "Content has 173.234.31.186", content_index=content_index)
+
+    """
+
+    df = df[get_df_mask_from_filtering_string(df, filtering_string, content_index=content_index)]
+    df = df.apply(lambda column: column.cat.remove_unused_categories()
+                  if isinstance(column.dtype, pd.CategoricalDtype) else column)
+
+    print(f"(logparser.py) Filtered df length: {len(df)}")
+    return df
+
+
+
+def parse_time(value): 
+
+    """
+    Parses a time written by a user, e.g. a bound of a filter.
+
+    Times are day first like TimeFull, '%d-%m-%Y %H:%M:%S' or shortened to the minutes or the date (see
+    TIME_FORMATS). Other strings, e.g. ISO 8601 '2016-12-10 09:00', and datetime objects are read by
+    pd.Timestamp.
+
+    Parameters:
+    value (str or datetime): The time.
+
+    Returns:
+    pd.Timestamp: The time.
+
+    Raises:
+    ValueError: If value is not a time.
+
+    Example:
+    >>> parse_time('10-12-2016')
+    Timestamp('2016-12-10 00:00:00')
+
+    """
+
+    if isinstance(value, str):
+        for time_format in TIME_FORMATS:
+            try:
+                return pd.to_datetime(value, format=time_format)
+            except ValueError:
+                pass
+    return pd.Timestamp(value)
+
+
+def _get_codes_and_values(series): 
+
+    # Distinct values of a column and the position of each row's value among them
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, values = pd.factorize(series)
+    return codes, pd.Index(values)
+
+
+def _get_months(dates): 
+
+    # Month numbers (1-12) of a column of month abbreviations
+    codes, values = _get_codes_and_values(dates)
+    value_months = values.map(MONTH_NUMBERS)
+    if value_months.isna().any():
+        raise ValueError(f"Unknown month names in the Date column: {list(values[value_months.isna()])}")
+    return value_months.to_numpy(dtype=np.int64)[codes]
+
+
+def get_time_full(df, year=None, reference_time=None, rollovers=None): 
+
+    """
+    Builds full timestamps from the Date (month name), Day and Time columns of a log.
+
+    Syslog-style logs (e.g. OpenSSH) don't record the year. Months, days and times are converted once per
+    distinct value, with an explicit format, and combined as numbers instead of formatting and parsing a
+    string per row. The year is incremented whenever the month goes back by more than 6 (e.g. Dec -> Jan),
+    so logs spanning new year stay in order.
+
+    Parameters:
+    df (pd.DataFrame): The log, with 'Date' (e.g. 'Dec'), 'Day' (e.g. 10) and 'Time' (e.g. '06:55:46') columns,
+        plain or categorical.
+    year (int, optional): The year of the first entry. Default is None, in which case the last entry is
+        taken to be the most recent date up to reference_time.
+    reference_time (pd.Timestamp, optional): When the log was written (e.g. the modification time of the file),
+        used when year is None. Default is None, i.e. now.
+    rollovers (np.ndarray, optional): The number of new years between the first entry of the log and each row,
+        when df is only part of the log (e.g. a filtered chunk). Default is None, i.e. counted from df.
+
+    Returns:
+    pd.Series: The timestamps (datetime64), aligned with df.
+
+    Raises:
+    ValueError: If a Date isn't a month abbreviation, or a Day or Time doesn't parse.
+
+    Example:
+    >>> df = pd.DataFrame({'Date': ['Dec', 'Jan'], 'Day': [31, 1], 'Time': ['23:59:59', '00:00:01']})
+    >>> get_time_full(df, year=2016)
+    0   2016-12-31 23:59:59
+    1   2017-01-01 00:00:01
+    dtype: datetime64[us]
+
+    """
+
+    if len(df) == 0:
+        return pd.Series(pd.to_datetime([]), index=df.index)
+
+    months = _get_months(df['Date'])
+
+    codes, values = _get_codes_and_values(df['Day'])
+    days = pd.to_numeric(values).to_numpy(dtype=np.int64)[codes]
+
+    # Times are parsed as times of the (arbitrary) epoch day, leaving the offset from midnight
+    codes, values = _get_codes_and_values(df['Time'])
+    times = (pd.to_datetime(values.astype(str), format='%H:%M:%S') - pd.Timestamp('1900-01-01')).to_numpy()[codes]
+
+    if rollovers is None:
+        rollovers = get_year_rollovers(months)
+    if year is None:
+        year = infer_first_year(months[-1], rollovers[-1], reference_time)
+
+    dates = pd.to_datetime(pd.DataFrame({'year': year + rollovers, 'month': months, 'day': days}))
+    return pd.Series(dates.to_numpy() + times, index=df.index)
+
+
+def get_csv_columns(path): 
+
+    """
+    Reads the column names from the header of a CSV file.
+
+    Parameters:
+    path (str): The file path to the CSV file, plain or compressed (gzip, bz2, xz or zstd).
+
+    Returns:
+    list: The column names.
+
+    Example:
+    >>> get_csv_columns('input_logs/openssh.csv')
+    ['LineId', 'Date', 'Day', 'Time', 'Component', 'Pid', 'Content', 'EventId', 'EventTemplate']
+
+    """
+
+    with open_log_file(path) as f:
+        header = io.TextIOWrapper(f, encoding='utf-8', newline='').readline()
+    return next(csv.reader([header]), [])
+
+
+def _get_first_year(path): 
+
+    # Year of the first entry of a log parsed by gateway.parse_log, whose Timestamp column already has the years
+    # inferred from the raw log (see gateway.parse_log.get_year_starts), None for other csv files
+    if 'Timestamp' not in get_csv_columns(path):
+        return None
+    with open_log_file(path) as f:
+        first_timestamp = pd.to_datetime(pd.read_csv(f, usecols=['Timestamp'], nrows=1)['Timestamp'],
+                                         errors='coerce')
+    return None if first_timestamp.empty or pd.isna(first_timestamp.iloc[0]) else first_timestamp.iloc[0].year
+
+
+def iter_log_csv_chunks(path, chunk_size=CSV_CHUNK_SIZE, usecols=None, engine='c'): 
+
+    """
+    Reads a CSV log file in chunks, with the known column types of CSV_COLUMN_DTYPES.
+
+    String columns are read directly as categoricals, so a chunk never holds a Python string per row.
+
+    Parameters:
+    path (str): The file path to the CSV log file, plain or compressed (gzip, bz2, xz or zstd).
+    chunk_size (int, optional): The number of rows per chunk with the 'c' engine. The 'pyarrow' engine reads
+        blocks of chunk_size * 128 bytes instead. Default is CSV_CHUNK_SIZE.
+    usecols (list, optional): The columns to read, in the order of the file. Default is None, i.e. all.
+    engine (str, optional): 'c' (pandas) or 'pyarrow' (pyarrow.csv streaming reader, multi-threaded).
+        Default is 'c'.
+
+    Yields:
+    pd.DataFrame: The chunks, with a RangeIndex continuing from the previous chunk.
+
+    Raises:
+    ValueError: If engine is unknown.
+    ImportError: If engine is 'pyarrow' and pyarrow isn't installed.
+
+    Example:
+    >>> for chunk in iter_log_csv_chunks('openssh.csv', usecols=['Date', 'Day', 'Time', 'Pid']):
+    ...     print(len(chunk))
+
+    """
+
+    start = 0
+    with open_log_file(path) as f:
+        if engine == 'c':
+            chunks = pd.read_csv(f, chunksize=chunk_size, usecols=usecols, dtype=CSV_COLUMN_DTYPES)
+        elif engine == 'pyarrow':
+            try:
+                import pyarrow as pa
+                import pyarrow.csv as pa_csv
+            except ImportError as e:
+                raise ImportError("The pyarrow engine requires pyarrow, install it with `pip install pyarrow`") from e
+            pa_types = {'int64': pa.int64(), 'category': pa.dictionary(pa.int32(), pa.string())}
+            reader = pa_csv.open_csv(
+                f, read_options=pa_csv.ReadOptions(block_size=chunk_size * 128),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={column: pa_types[dtype] for column, dtype in CSV_COLUMN_DTYPES.items()},
+                    include_columns=usecols))
+            chunks = (batch.to_pandas() for batch in reader)
         else:
-            mask |= eval(cond_mask)
-            first_time = False 
-    
-    return mask 
+            raise ValueError(f"Unknown csv engine '{engine}', use 'c' or 'pyarrow'")
 
+        for chunk in chunks:
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield compact_parsed_log(chunk)
 
 
-def log_csv_to_df(path=None, filtering_string=None,df=None): 
+def log_csv_to_df(path=None, filtering_string=None,df=None,content_index=None,year=None,chunk_size=CSV_CHUNK_SIZE,
+                  usecols=None,engine='c'): 
 
     """
     Reads a CSV log file into a DataFrame and performs optional filtering.
@@ -126,12 +851,23 @@ def log_csv_to_df(path=None, filtering_string=None,df=None):
     based on a provided filtering string containing boolean expressions involving column titles.
 
     Parameters:
-    path (str): The file path to the CSV log file.
+    path (str): The file path to the CSV log file, plain or compressed (gzip, bz2, xz or zstd).
     filtering_string (str, optional): A string containing boolean expressions involving
         column titles for filtering the DataFrame. Default is None.
+    content_index (ContentIndex, optional): An index of the Content column, used by the filter.
+        Default is None.
+    year (int, optional): The year of the first entry, see get_time_full. Default is None, i.e. the year of
+        the first Timestamp of logs parsed by gateway.parse_log, so that TimeFull agrees with it, and otherwise
+        inferred from the modification time of the file (or the current time when a DataFrame is passed).
+    chunk_size (int, optional): The file is read and filtered chunk by chunk (see iter_log_csv_chunks), so
+        only the rows satisfying filtering_string are kept in memory. Default is CSV_CHUNK_SIZE.
+    usecols (list, optional): The columns to keep. Date, Day and Time (combined into TimeFull) and the
+        columns of the filter are read in any case. Default is None, i.e. all.
+    engine (str, optional): The csv reader, 'c' or 'pyarrow', see iter_log_csv_chunks. Default is 'c'.
 
     Returns:
-    pd.DataFrame: A DataFrame containing the log data with optional filtering applied.
+    pd.DataFrame: A DataFrame containing the log data with optional filtering applied. String columns
+        are categorical (see gateway.parse_log.compact_parsed_log).
 
     Example:
     >>> import pandas as pd
@@ -141,37 +877,99 @@ def log_csv_to_df(path=None, filtering_string=None,df=None):
     >>> df = pd.DataFrame(data)
     >>> path = 'sample_log.csv'
     >>> filtering_string = "Day > 2"
-    >>> log_df = log_csv_to_df(path, filtering_string)
+    >>> log_df = log_csv_to_df(path, filtering_string, year=2016)
     >>> print(log_df)
-        Date  Day      Time            TimeFull
-    2    Mar    3  10:30:00  03-03-2016 10:30:00
-    3    Apr    4  12:45:00  04-04-2016 12:45:00
-    4    May    5  11:30:00  05-05-2016 11:30:00
+                  TimeFull
+    2  2016-03-03 10:30:00
+    3  2016-04-04 12:45:00
+    4  2016-05-05 11:30:00
 
     """
+    if df is None and year is None:
+        year = _get_first_year(path)
+
+    # A content index covers the whole unfiltered file, so the filter is then applied after reading it all
+    if df is None and filtering_string and content_index is None:
+        return _read_filtered_log_csv(path, filtering_string, year, chunk_size, usecols, engine)
+
+    reference_time = None
     if df is not None:
         df = df
     else:
-        df = pd.read_csv(path)
+        # Compressed csv files (.gz/.bz2/.xz/.zst) are decompressed while they are read
+        columns = None if usecols is None else [column for column in get_csv_columns(path)
+                                                if column in usecols or column in ('Date', 'Day', 'Time')]
+        df = concat_parsed_logs(iter_log_csv_chunks(path, chunk_size=chunk_size, usecols=columns, engine=engine))
+        reference_time = pd.Timestamp(os.path.getmtime(path), unit='s')
 
-    YEAR = 2016 # TODO: openssh.csv doesn't have an associated year
-    month_dict = {'Jan': '1', 'Feb': '2', 'Mar': '3', 'Apr': '4', 'May': '5', 'Jun': '6', 'Jul': '7', 'Aug': '8', 'Sep': '9', 'Oct': '10', 'Nov': '11', 'Dec': '12'}
-
-    # Convert time into full timestamp (unified format: %d-%m-%Y %H:%M:%S)
-    time_full = [] 
-    for idx, entry in enumerate(df['Date']): 
-        date_full = f"{df['Day'][idx]}-{month_dict[entry]}-{YEAR}" 
-        time_full.append(pd.to_datetime(date_full + ' ' + df['Time'][idx], format='%d-%m-%Y %H:%M:%S'))
-    df['TimeFull'] = time_full 
+    # Convert time into full timestamp, openssh.csv doesn't have an associated year
+    df['TimeFull'] = get_time_full(df, year=year, reference_time=reference_time)
 
     # Delete these columns, as no longer needed
     df.drop(['Date', 'Day', 'Time'], axis=1, inplace=True)
 
-    if filtering_string: 
-        mask = get_df_mask_from_filtering_string(df, filtering_string)
-        df = df[mask]
+    # Store repeated strings (EventId, EventTemplate, Component, ...) as categoricals
+    compact_parsed_log(df)
 
-        print(f"(logparser.py) Filtered df length: {len(df)}")
+    if filtering_string: 
+        df = filter_df(df, filtering_string, content_index=content_index)
 
     return df 
 
+
+def _read_filtered_log_csv(path, filtering_string, year, chunk_size, usecols, engine): 
+
+    # Filters every chunk as it's read, TimeFull is built once the whole file (and so the year) is known
+    # unless the filter needs it
+    compiled_filter = compile_filter(filtering_string)
+    columns = get_csv_columns(path)
+    # The unnamed index column of csv files written by gateway.parse_log can't be selected by name, it's skipped
+    read_columns = [column for column in columns if column and (usecols is None or column in usecols
+                    or column in ('Date', 'Day', 'Time') or column in compiled_filter.columns)]
+    # Columns only read for the filter
+    filter_columns = [column for column in read_columns if usecols is not None and column not in usecols
+                      and column not in ('Date', 'Day', 'Time')]
+    reference_time = pd.Timestamp(os.path.getmtime(path), unit='s')
+
+    if 'TimeFull' in compiled_filter.columns and year is None:
+        # The year of the first entry depends on the last one, found with a first pass over the dates only
+        previous_month, total_rollovers = None, 0
+        for chunk in iter_log_csv_chunks(path, chunk_size=chunk_size, usecols=['Date'], engine=engine):
+            months = _get_months(chunk['Date'])
+            if len(months):
+                total_rollovers += get_year_rollovers(months, previous_month)[-1]
+                previous_month = months[-1]
+        year = infer_first_year(previous_month or 1, total_rollovers, reference_time)
+
+    previous_month, previous_rollovers = None, 0
+    kept = []
+    for chunk in iter_log_csv_chunks(path, chunk_size=chunk_size, usecols=read_columns, engine=engine):
+        if len(chunk) == 0:
+            continue
+        months = _get_months(chunk['Date'])
+        rollovers = previous_rollovers + get_year_rollovers(months, previous_month)
+        previous_month, previous_rollovers = months[-1], rollovers[-1]
+
+        if 'TimeFull' in compiled_filter.columns:
+            chunk['TimeFull'] = get_time_full(chunk, year=year, rollovers=rollovers)
+        mask = compiled_filter(chunk).to_numpy()
+        chunk = chunk[mask].drop(columns=filter_columns)
+        chunk['Rollovers'] = rollovers[mask]
+        kept.append(chunk)
+
+    if not kept:
+        raise ValueError(f"{path} has no rows")
+    df = concat_parsed_logs(kept)
+    df = df.apply(lambda column: column.cat.remove_unused_categories()
+                  if isinstance(column.dtype, pd.CategoricalDtype) else column)
+
+    rollovers = df.pop('Rollovers').to_numpy()
+    if 'TimeFull' not in df.columns:
+        if year is None:
+            year = infer_first_year(previous_month, previous_rollovers, reference_time)
+        df['TimeFull'] = get_time_full(df, year=year, rollovers=rollovers)
+    df.drop(['Date', 'Day', 'Time'], axis=1, inplace=True)
+
+    print(f"(logparser.py) Filtered df length: {len(df)}")
+    return df
+
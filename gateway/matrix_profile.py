@@ -19,11 +19,44 @@
 
 This file contains: 
 
+- class ProfileCache() 
+
+  - def __init__(self, directory, max_bytes=512 * 2 ** 20)
+  - def get_key(self, event_series, windows=None, algorithm='mp.compute')
+  - def get(self, key)
+  - def put(self, key, profile)
+
+- def build_event_count_matrix(df, bin_width='1min')
+- def get_default_windows(event_series, threshold=DEFAULT_WINDOW_THRESHOLD)
+- def compute_pan_profile(event_series, windows=None, n_jobs=None, executor=None)
+
+- class StreamingMatrixProfile() 
+
+  - def __init__(self, window, series=None, exclusion_zone=None)
+  - def update(self, value)
+  - def extend(self, values)
+  - def get_discords(self, k=4, exclusion_zone=None)
+
+- class AnytimeMatrixProfile() 
+
+  - def __init__(self, series, window, exclusion_zone=None, sample_step=None, random_state=None, normalize=True)
+  - def refine(self, time_budget=None, target_progress=1.0, sample_share=0.5)
+  - def get_discords(self, k=4, exclusion_zone=None)
+  - def to_profile(self)
+
+- def rank_event_discords(counts, window, k=3, exclusion_zone=None, normalize=False, n_jobs=None, executor=None)
+
 - class MatrixProfileAnalyzer() 
 
-  - def __init__(self, df)
-  - def get_discords(self, k=4, windows=None, subset=None)
-  - def get_motifs(self, k=4, subset=None)
+  - def __init__(self, df, raw_log=None, profile_cache=None, n_jobs=1, executor=None)
+  - def get_anytime_profile(self, window, time_budget=2.0, target_progress=1.0, subset=None)
+  - def get_event_discords(self, window, bin_width='1min', k=3, exclusion_zone=None, normalize=False)
+  - def start_streaming(self, window, exclusion_zone=None)
+  - def append_entries(self, df)
+  - def get_time_slice(self, start_time=None, end_time=None)
+  - def get_profile(self, windows=None, subset=None)
+  - def get_discords(self, k=4, windows=None, subset=None, time_budget=None)
+  - def get_motifs(self, k=4, subset=None, windows=None, time_budget=None)
   - def get_arr_subset(self, time_arr, event_arr, range)
   - def get_df_entries(self, target, window=5, after=False)
   - def plot_timeseries(self, dir)
@@ -39,10 +72,783 @@ import matrixprofile as mp
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from gateway.logparser import parse_time
+from gateway.parse_log import concat_parsed_logs
+import copy
+import hashlib
+import json
 import os 
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
 plt.style.use('https://raw.githubusercontent.com/TDAmeritrade/stumpy/main/docs/stumpy.mplstyle')
 
+# Correlation threshold of the upper window of the default window range, the one of mp.compute
+DEFAULT_WINDOW_THRESHOLD = 0.98
+
+
+def _shift_index(index, offset):
+    # Discords and motifs of a matrix profile are positions, those of a pan matrix profile (window, position) pairs,
+    # of which only the position is shifted
+    if offset == 0:
+        return index
+    if np.ndim(index) == 0:
+        return index + offset
+    return (index[0], index[1] + offset)
+
+
+
+def _encode_profile(value, arrays, path):
+    # JSON-able description of a profile, its arrays are moved to arrays under their path in the profile
+    if isinstance(value, np.ndarray):
+        arrays[path] = value
+        return {'__array__': path}
+    if isinstance(value, dict):
+        return {str(key): _encode_profile(item, arrays, f"{path}/{key}") for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_profile(item, arrays, f"{path}/{i}") for i, item in enumerate(value)]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode_profile(value, arrays):
+    if isinstance(value, dict):
+        if set(value) == {'__array__'}:
+            return arrays[value['__array__']]
+        return {key: _decode_profile(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_profile(item, arrays) for item in value]
+    return value
+
+
+class ProfileCache: 
+
+    """
+    Persistent cache of computed MatrixProfile profiles.
+
+    Profiles are stored in directory as a .npz file of their arrays and a .json file of the rest of the
+    profile, under a key hashing the event series, the windows, the function that computed the profile
+    (whose profiles differ in their details, e.g. mp.compute or compute_pan_profile) and the matrixprofile
+    version. Loading a profile counts as a use: once the files exceed max_bytes, the least recently used
+    profiles are deleted first.
+
+    Parameters:
+    directory (str): The directory of the cache, created if needed.
+    max_bytes (int, optional): The disk budget of the cache. Default is 512 MB.
+
+    Example:
+    >>> cache = ProfileCache('profile_cache/', max_bytes=256 * 2 ** 20)
+    >>> key = cache.get_key(event_series, windows=[5, 10, 15])
+    >>> profile = cache.get(key)
+    >>> if profile is None:
+    ...     profile = mp.compute(event_series, [5, 10, 15])
+    ...     cache.put(key, profile)
+
+    """
+
+    def __init__(self, directory, max_bytes=512 * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, event_series, windows=None, algorithm='mp.compute'):
+        """ Returns the key of the profile of event_series with windows (None for the default windows),
+            computed by algorithm
+        """
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(event_series, dtype=np.float64).tobytes())
+        digest.update(json.dumps({
+            'windows': np.atleast_1d(windows).tolist() if windows is not None else None,
+            'algorithm': algorithm,
+            'version': getattr(mp, '__version__', None),
+        }).encode())
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        return os.path.join(self.directory, key + '.npz'), os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        """ Returns the cached profile of key, or None
+        """
+        arrays_path, description_path = self._paths(key)
+        try:
+            with open(description_path) as f:
+                description = json.load(f)
+            with np.load(arrays_path, allow_pickle=False) as arrays:
+                profile = _decode_profile(description, dict(arrays))
+        except (OSError, ValueError, KeyError):
+            return None
+        for path in (arrays_path, description_path):
+            os.utime(path)
+        return profile
+
+    def put(self, key, profile):
+        """ Stores profile under key, then evicts the least recently used profiles beyond max_bytes
+        """
+        arrays = {}
+        description = _encode_profile(profile, arrays, '')
+        arrays_path, description_path = self._paths(key)
+
+        # Written aside and renamed, so a concurrent get never sees a partial profile
+        with open(arrays_path + '.tmp', 'wb') as f:
+            np.savez(f, **arrays)
+        with open(description_path + '.tmp', 'w') as f:
+            json.dump(description, f)
+        os.replace(arrays_path + '.tmp', arrays_path)
+        os.replace(description_path + '.tmp', description_path)
+        self._evict()
+
+    def _evict(self):
+        entries = {}
+        for name in os.listdir(self.directory):
+            key, extension = os.path.splitext(name)
+            if extension in ('.npz', '.json'):
+                stat = os.stat(os.path.join(self.directory, name))
+                used, size = entries.get(key, (0, 0))
+                entries[key] = (max(used, stat.st_mtime), size + stat.st_size)
+
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda entry: entry[1][0]):
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+            print(f"(matrix_profile.py) Evicted profile {key[:12]} from the cache")
+
+
+def _get_event_numbers(eventid_series):
+    # Event ids 'E<number>' are converted once per distinct id
+    if isinstance(eventid_series.dtype, pd.CategoricalDtype):
+        codes, event_ids = eventid_series.cat.codes.to_numpy(), eventid_series.cat.categories
+    else:
+        codes, event_ids = pd.factorize(eventid_series)
+    assert (codes >= 0).all(), "Column 'EventId' has missing values"
+    return pd.Index(event_ids).astype(str).str[1:].astype(np.int32).to_numpy()[codes]
+
+
+def build_event_count_matrix(df, bin_width='1min'):
+
+    """
+    Counts the occurrences of every event in fixed-width time bins.
+
+    Each column is the count series of an event, sampled at a fixed rate, a far shorter input for the
+    matrix profile than the sequence of event ids of every line (whose numeric order means nothing). The
+    counts come from a single np.bincount over bin * n_events + event code.
+
+    Parameters:
+    df (pd.DataFrame): The log, with 'TimeFull' (datetimes or strings in the format '%d-%m-%Y %H:%M:%S')
+        and 'EventId' columns.
+    bin_width (str or pd.Timedelta, optional): The width of the bins. Default is '1min'.
+
+    Returns:
+    pd.DataFrame: The (n_bins x n_events) counts (int64), indexed by the start of the bins (from the bin of
+        the first entry to the bin of the last one, empty bins included), with a column per event id.
+
+    Raises:
+    ValueError: If bin_width isn't positive, or EventId has missing values.
+
+    Example:
+    >>> counts = build_event_count_matrix(df, bin_width='30s')
+    >>> counts['E27']
+    TimeFull
+    2016-12-10 06:55:30    1
+    2016-12-10 06:56:00    0
+    ...
+
+    """
+
+    bin_width = pd.Timedelta(bin_width)
+    if bin_width <= pd.Timedelta(0):
+        raise ValueError(f"The bin width must be positive, not {bin_width}")
+
+    times = pd.DatetimeIndex(pd.to_datetime(df['TimeFull'], format='%d-%m-%Y %H:%M:%S')).as_unit('ns')
+    if isinstance(df['EventId'].dtype, pd.CategoricalDtype):
+        codes, event_ids = df['EventId'].cat.codes.to_numpy(), df['EventId'].cat.categories
+    else:
+        codes, event_ids = pd.factorize(df['EventId'], sort=True)
+    if (codes < 0).any():
+        raise ValueError("Column 'EventId' has missing values")
+    if len(times) == 0:
+        return pd.DataFrame(np.zeros((0, len(event_ids)), dtype=np.int64), columns=pd.Index(event_ids, name='EventId'),
+                            index=pd.DatetimeIndex([], name='TimeFull'))
+
+    origin = times.min().floor(bin_width)
+    bins = (times.asi8 - origin.value) // bin_width.value
+    n_bins, n_events = int(bins.max()) + 1, len(event_ids)
+    counts = np.bincount(bins * n_events + codes, minlength=n_bins * n_events).reshape(n_bins, n_events)
+
+    return pd.DataFrame(counts, columns=pd.Index(event_ids, name='EventId'),
+                        index=pd.date_range(origin, periods=n_bins, freq=bin_width, name='TimeFull'))
+
+
+def _probe_default_windows(series, threshold):
+    # The default window range of mp.compute, from 8 to the upper window of maximum_subsequence, and the
+    # profiles of the windows it probed on the way, as {window: (profile, index)}
+    probe = mp.algorithms.maximum_subsequence(series, threshold, include_pmp=True)
+    windows = np.arange(8, int(probe['upper_window']) + 1)
+    probed = {int(window): (profile, np.where(np.isnan(index), -1, index).astype(np.int64))
+              for window, profile, index in zip(probe['windows'], probe['pmp'], probe['pmpi'])}
+    return windows, probed
+
+
+def get_default_windows(event_series, threshold=DEFAULT_WINDOW_THRESHOLD):
+
+    """
+    Returns the window sizes of the pan matrix profile mp.compute computes when no windows are given.
+
+    Like mp.compute, the upper window is the largest one whose subsequences are still correlated with
+    their nearest neighbor above threshold (mp.algorithms.maximum_subsequence), which takes computing the
+    profiles of a few windows.
+
+    Parameters:
+    event_series (np.ndarray): The series.
+    threshold (float, optional): The correlation threshold. Default is DEFAULT_WINDOW_THRESHOLD, the one
+        of mp.compute.
+
+    Returns:
+    np.ndarray: The window sizes, from 8 up to the upper window.
+
+    Raises:
+    matrixprofile.exceptions.NoSolutionPossible: If no window reaches the threshold.
+
+    """
+
+    return _probe_default_windows(np.ascontiguousarray(event_series, dtype=np.float64), threshold)[0]
+
+
+def _attach_shared_array(name, shape, dtype):
+    # Arrays are created (and unlinked) by the parent, workers only map them
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _compute_window_profiles(series_name, profile_name, index_name, shape, tasks):
+    # Worker: computes the matrix profile of every (row, window) of tasks into the shared pan profile
+    memories = []
+    try:
+        memory, series = _attach_shared_array(series_name, (shape[1],), np.float64)
+        memories.append(memory)
+        memory, pan_profile = _attach_shared_array(profile_name, shape, np.float64)
+        memories.append(memory)
+        memory, pan_index = _attach_shared_array(index_name, shape, np.int64)
+        memories.append(memory)
+        for row, window in tasks:
+            profile = mp.compute(series, int(window))
+            pan_profile[row, :len(profile['mp'])] = profile['mp']
+            pan_index[row, :len(profile['pi'])] = profile['pi']
+        del series, pan_profile, pan_index
+    finally:
+        for memory in memories:
+            memory.close()
+    return len(tasks)
+
+
+def compute_pan_profile(event_series, windows=None, n_jobs=None, executor=None):
+
+    """
+    Computes the pan matrix profile of a series with the windows spread over a pool of processes.
+
+    The windows are independent, so each worker computes the matrix profile (mp.compute) of a share of
+    them. The series and the resulting pan profile are in shared memory: workers map them instead of
+    receiving and returning pickled copies. Windows are dealt round-robin, so every worker gets both small
+    and large (cheaper) windows.
+
+    Parameters:
+    event_series (np.ndarray): The series.
+    windows (list, optional): The window sizes. Default is None, i.e. get_default_windows, whose probed
+        profiles are reused instead of computed again, as mp.compute does.
+    n_jobs (int, optional): The number of worker processes. Default is None, i.e. one per CPU.
+    executor (concurrent.futures.Executor, optional): A process pool to run the windows on instead of
+        creating one, it isn't shut down. Default is None.
+
+    Returns:
+    dict: The pan matrix profile, like the one of mp.compute(event_series, windows): 'pmp' and 'pmpi'
+        have a row per window (inf and -1 past the end of the shorter rows), plus 'windows', 'data', ...
+
+    Example:
+    >>> profile = compute_pan_profile(analyzer.event_series, windows=range(8, 64), n_jobs=8)
+    >>> profile, discords = mp.discover.discords(profile, k=4), profile['discords']
+
+    """
+
+    series = np.ascontiguousarray(event_series, dtype=np.float64)
+    probed = {}
+    if windows is None:
+        windows, probed = _probe_default_windows(series, DEFAULT_WINDOW_THRESHOLD)
+    else:
+        windows = np.asarray(list(windows), dtype=np.int64)
+    n_jobs = n_jobs or os.cpu_count()
+    shape = (len(windows), len(series))
+
+    memories = []
+    try:
+        series_memory = shared_memory.SharedMemory(create=True, size=max(series.nbytes, 1))
+        memories.append(series_memory)
+        np.ndarray(series.shape, dtype=np.float64, buffer=series_memory.buf)[:] = series
+        profile_memory = shared_memory.SharedMemory(create=True, size=max(8 * shape[0] * shape[1], 1))
+        memories.append(profile_memory)
+        index_memory = shared_memory.SharedMemory(create=True, size=max(8 * shape[0] * shape[1], 1))
+        memories.append(index_memory)
+        pan_profile = np.ndarray(shape, dtype=np.float64, buffer=profile_memory.buf)
+        pan_index = np.ndarray(shape, dtype=np.int64, buffer=index_memory.buf)
+        pan_profile[:] = np.inf
+        pan_index[:] = -1
+
+        tasks = []
+        for row, window in enumerate(windows.tolist()):
+            if window in probed:
+                pan_profile[row], pan_index[row] = probed[window]
+            else:
+                tasks.append((row, window))
+        shares = [tasks[worker::n_jobs] for worker in range(n_jobs) if tasks[worker::n_jobs]]
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=n_jobs)
+        try:
+            futures = [executor.submit(_compute_window_profiles, series_memory.name, profile_memory.name,
+                                       index_memory.name, shape, share) for share in shares]
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        profile = {
+            'pmp': pan_profile.copy(), 'pmpi': pan_index.copy(), 'data': {'ts': series, 'query': None},
+            'windows': windows, 'sample_pct': 1, 'metric': 'euclidean', 'algorithm': 'skimp', 'join': False,
+            'class': 'PMP',
+        }
+        del pan_profile, pan_index
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+    return profile
+
+
+def _get_distances(qt, window, means, stds, mean, std):
+    # z-normalized Euclidean distances from dot products qt, elementwise for arrays of means and stds on
+    # both sides. Constant subsequences are at distance 0 of each other and sqrt(window) of any other one
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = (qt - window * means * mean) / (window * stds * std)
+    distances = np.sqrt(np.clip(2 * window * (1 - correlation), 0, None))
+    constant, other_constant = np.broadcast_arrays(stds == 0, std == 0)
+    return np.where(constant | other_constant, np.where(constant & other_constant, 0.0, np.sqrt(window)), distances)
+
+
+def _get_top_discords(profile, k, exclusion_zone):
+    # Positions of the k highest finite profile values, at least exclusion_zone apart
+    profile = np.where(np.isfinite(profile), profile, -np.inf)
+    discords = []
+    for position in np.argsort(-profile, kind='stable'):
+        if len(discords) == k or profile[position] == -np.inf:
+            break
+        if all(abs(position - discord) >= exclusion_zone for discord in discords):
+            discords.append(position)
+    return np.array(discords, dtype=np.int64)
+
+
+class StreamingMatrixProfile: 
+
+    """
+    Matrix profile of a growing series for a single window, updated as values arrive (STAMPI).
+
+    Appending a value adds one subsequence. Its distances to all the previous subsequences come from the
+    dot products of the previous last subsequence, shifted by one value (O(n) instead of O(n * window)).
+    They give the new subsequence's profile value and lower the profile of the earlier subsequences it is
+    the nearest neighbor of. Distances are z-normalized Euclidean distances. Constant subsequences (common
+    in event series) are at distance 0 of each other and sqrt(window) of any other subsequence.
+    Subsequences closer than exclusion_zone positions are not neighbors.
+
+    Parameters:
+    window (int): The subsequence length, at least 2.
+    series (array-like, optional): The initial values. Default is None.
+    exclusion_zone (int, optional): Default is None, i.e. ceil(window / 4) like mp.compute.
+
+    Raises:
+    ValueError: If window is less than 2.
+
+    Example:
+    >>> streaming_profile = StreamingMatrixProfile(32, analyzer.event_series)
+    >>> for event_number in new_event_numbers:
+    ...     score = streaming_profile.update(event_number)
+    >>> streaming_profile.get_discords(k=3)
+    array([1289,  754,   98])
+
+    """
+
+    def __init__(self, window, series=None, exclusion_zone=None):
+        if window < 2:
+            raise ValueError(f"The window must be at least 2, not {window}")
+        self.window = int(window)
+        self.exclusion_zone = int(np.ceil(window / 4)) if exclusion_zone is None else int(exclusion_zone)
+
+        self._length = 0
+        self._series = np.empty(1024)
+        self._means = np.empty(1024)
+        self._stds = np.empty(1024)
+        self._profile = np.empty(1024)
+        self._profile_index = np.empty(1024, dtype=np.int64)
+        self._last_qt = None
+
+        if series is not None:
+            self.extend(series)
+
+    def __len__(self):
+        """ Returns the number of subsequences """
+        return max(0, self._length - self.window + 1)
+
+    @property
+    def series(self):
+        return self._series[:self._length]
+
+    @property
+    def profile(self):
+        """ Distance of every subsequence to its nearest neighbor (inf without neighbor) """
+        return self._profile[:len(self)]
+
+    @property
+    def profile_index(self):
+        """ Position of the nearest neighbor of every subsequence (-1 without neighbor) """
+        return self._profile_index[:len(self)]
+
+    def _reserve(self, length):
+        # Buffers grow by doubling, so appending a value is amortized O(1) besides the profile update
+        if length <= len(self._series):
+            return
+        capacity = max(length, 2 * len(self._series))
+        for name in ('_series', '_means', '_stds', '_profile', '_profile_index'):
+            buffer = getattr(self, name)
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:len(buffer)] = buffer
+            setattr(self, name, grown)
+
+    def update(self, value):
+        """ Appends a value, returns the profile value of the new subsequence (nan while the series is
+            shorter than the window, inf when it has no neighbor yet)
+        """
+        self._reserve(self._length + 1)
+        self._series[self._length] = value
+        self._length += 1
+
+        m, n, series = self.window, self._length, self._series
+        if n < m:
+            return np.nan
+        j = n - m
+        subsequence = series[j:n]
+        mean, std = subsequence.mean(), subsequence.std()
+        self._means[j], self._stds[j] = mean, std
+
+        # Dot products of the new subsequence with subsequences 0..j, from those of the previous one
+        qt = np.empty(j + 1)
+        qt[0] = np.dot(series[:m], subsequence)
+        if j > 0:
+            qt[1:] = self._last_qt - series[:j] * series[j - 1] + series[m:m + j] * series[n - 1]
+        self._last_qt = qt
+
+        distances = _get_distances(qt, m, self._means[:j + 1], self._stds[:j + 1], mean, std)
+        distances[max(0, j - self.exclusion_zone):] = np.inf
+
+        nearest = int(np.argmin(distances))
+        self._profile[j] = distances[nearest]
+        self._profile_index[j] = nearest if np.isfinite(distances[nearest]) else -1
+
+        closer = np.flatnonzero(distances[:j] < self._profile[:j])
+        self._profile[closer] = distances[closer]
+        self._profile_index[closer] = j
+        return self._profile[j]
+
+    def extend(self, values):
+        """ Appends values one by one, returns the profile values of their subsequences (see update)
+        """
+        return np.array([self.update(value) for value in np.asarray(values, dtype=np.float64)])
+
+    def get_discords(self, k=4, exclusion_zone=None):
+
+        """
+        Returns the positions of the k subsequences farthest from their nearest neighbor.
+
+        Parameters:
+        k (int, optional): The number of discords. Default is 4.
+        exclusion_zone (int, optional): Discords are at least this far apart. Default is None, i.e. the window.
+
+        Returns:
+        np.ndarray: The positions of the discords, highest profile value first. Subsequences without
+            neighbor (inf) aren't discords, so fewer than k may be returned.
+
+        """
+
+        return _get_top_discords(self.profile, k, self.window if exclusion_zone is None else exclusion_zone)
+
+
+class AnytimeMatrixProfile: 
+
+    """
+    Approximate matrix profile of a series for a single window, refined within time budgets (SCRIMP++).
+
+    A first phase (PRESCRIMP) computes the full distance profiles of subsequences sampled every
+    sample_step positions, in random order. The sample and its nearest neighbor are then walked side by
+    side for sample_step positions in both directions, since neighbors of neighbors tend to be close
+    too, which quickly gives every subsequence a close neighbor. The
+    second phase (SCRIMP) computes the diagonals of the distance matrix, in random order, each in O(n)
+    from a running sum of products. Once every diagonal is done the profile is exact. Each call to refine
+    resumes where the previous one stopped, so a first answer is available within seconds and improves
+    with later calls. Within a time budget, PRESCRIMP only gets a share of it, so that on long series
+    (where each sample is an FFT over the whole series) the diagonals still advance. Progress counts the
+    distances computed by both phases. Distances are those of StreamingMatrixProfile, or plain Euclidean
+    distances between the raw subsequences if not normalize.
+
+    Parameters:
+    series (array-like): The series.
+    window (int): The subsequence length, at least 2.
+    exclusion_zone (int, optional): Default is None, i.e. ceil(window / 4) like mp.compute.
+    sample_step (int, optional): The distance between the subsequences sampled by PRESCRIMP. Default is
+        None, i.e. exclusion_zone.
+    random_state (int, optional): Seed of the order of the samples and diagonals. Default is None.
+    normalize (bool, optional): Whether subsequences are z-normalized, i.e. compared by shape only.
+        Default is True.
+
+    Raises:
+    ValueError: If window is less than 2 or longer than the series.
+
+    Example:
+    >>> anytime_profile = AnytimeMatrixProfile(analyzer.event_series, window=32, random_state=0)
+    >>> anytime_profile.refine(time_budget=2.0)
+    >>> anytime_profile.progress, anytime_profile.get_discords(k=3)
+    (0.18, array([81233,  5120, 640022]))
+    >>> anytime_profile.refine(time_budget=10.0)
+
+    """
+
+    def __init__(self, series, window, exclusion_zone=None, sample_step=None, random_state=None, normalize=True):
+        self.series = np.ascontiguousarray(series, dtype=np.float64)
+        if window < 2 or window > len(self.series):
+            raise ValueError(f"The window must be between 2 and the length of the series, not {window}")
+        self.window = int(window)
+        self.exclusion_zone = int(np.ceil(window / 4)) if exclusion_zone is None else int(exclusion_zone)
+
+        subsequences = np.lib.stride_tricks.sliding_window_view(self.series, self.window)
+        self._subsequences = subsequences
+        self._means = subsequences.mean(axis=1)
+        self._stds = subsequences.std(axis=1)
+        self.normalize = normalize
+        if not normalize:
+            self._squares = np.einsum('ij,ij->i', subsequences, subsequences)
+        self.profile = np.full(len(subsequences), np.inf)
+        self.profile_index = np.full(len(subsequences), -1, dtype=np.int64)
+
+        random = np.random.default_rng(random_state)
+        self.sample_step = max(1, self.exclusion_zone if sample_step is None else int(sample_step))
+        self._samples = random.permutation(np.arange(0, len(subsequences), self.sample_step))
+        self._series_fft = None
+        self._diagonals = random.permutation(np.arange(self.exclusion_zone + 1, len(subsequences)))
+        self._samples_done = 0
+        self._diagonals_done = 0
+        # Work of both phases in distances: a sample computes a whole distance profile, diagonal k n - k
+        self._work = len(self._samples) * len(subsequences) + int((len(subsequences) - self._diagonals).sum())
+        self._work_done = 0
+
+    @property
+    def progress(self):
+        """ Fraction of the distances of both phases computed, the profile is exact at 1.0 """
+        return 1.0 if self.converged else self._work_done / self._work
+
+    @property
+    def converged(self):
+        return self._diagonals_done == len(self._diagonals)
+
+    def _get_distances(self, qt, left, right):
+        # Distances between the subsequences at left and right (positions or slices) from their dot products
+        if not self.normalize:
+            return np.sqrt(np.maximum(self._squares[left] + self._squares[right] - 2 * qt, 0))
+        return _get_distances(qt, self.window, self._means[left], self._stds[left], self._means[right],
+                              self._stds[right])
+
+    def _update(self, positions, neighbors, distances):
+        closer = distances < self.profile[positions]
+        self.profile[positions[closer]] = distances[closer]
+        self.profile_index[positions[closer]] = neighbors[closer]
+
+    def _compute_pairs(self, positions, neighbors):
+        # Distances between the subsequences at positions and those at neighbors, computed directly
+        qt = np.einsum('ij,ij->i', self._subsequences[positions], self._subsequences[neighbors])
+        distances = self._get_distances(qt, positions, neighbors)
+        self._update(positions, neighbors, distances)
+        self._update(neighbors, positions, distances)
+
+    def _compute_sample(self, position):
+        # Distance profile of one subsequence: its dot products with all subsequences by FFT convolution
+        m, n = self.window, len(self.profile)
+        size = 1 << int(np.ceil(np.log2(len(self.series) + m)))
+        if self._series_fft is None:
+            self._series_fft = np.fft.rfft(self.series, size)
+        query = self.series[position:position + m]
+        qt = np.fft.irfft(self._series_fft * np.fft.rfft(query[::-1], size), size)[m - 1:m - 1 + n]
+        distances = self._get_distances(qt, slice(None), position)
+        distances[max(0, position - self.exclusion_zone):position + self.exclusion_zone + 1] = np.inf
+
+        nearest = int(np.argmin(distances))
+        if not np.isfinite(distances[nearest]):
+            return
+        self._update(np.arange(n), np.full(n, position), distances)
+        self._update(np.array([position]), np.array([nearest]), distances[[nearest]])
+
+        # Walk the sample and its nearest neighbor side by side
+        shifts = np.arange(-self.sample_step, self.sample_step + 1)
+        shifts = shifts[(shifts != 0) & (position + shifts >= 0) & (nearest + shifts >= 0)
+                        & (position + shifts < n) & (nearest + shifts < n)]
+        self._compute_pairs(position + shifts, nearest + shifts)
+
+    def _compute_diagonal(self, k):
+        # Distances between subsequences i and i + k for every i, from a running sum of the products
+        m, n = self.window, len(self.profile)
+        length = n - k
+        products = np.cumsum(self.series[:len(self.series) - k] * self.series[k:])
+        qt = products[m - 1:m - 1 + length] - np.concatenate([[0.0], products[:length - 1]])
+        distances = self._get_distances(qt, slice(None, length), slice(k, None))
+        positions = np.arange(length)
+        self._update(positions, positions + k, distances)
+        self._update(positions + k, positions, distances)
+
+    def refine(self, time_budget=None, target_progress=1.0, sample_share=0.5):
+
+        """
+        Refines the profile until the time budget is spent or the target progress is reached.
+
+        Parameters:
+        time_budget (float, optional): The wall-clock budget of this call, in seconds. At least one sample
+            or diagonal is computed per call. Default is None, i.e. no limit.
+        target_progress (float, optional): Stops once this fraction of the work is done (see progress).
+            Default is 1.0, i.e. the exact profile.
+        sample_share (float, optional): The share of time_budget PRESCRIMP may use before this call moves
+            on to the diagonals, 0 skips the remaining samples. Default is 0.5.
+
+        Returns:
+        np.ndarray: The profile (distance of every subsequence to its nearest neighbor found so far).
+
+        """
+
+        start = time.perf_counter()
+        deadline = None if time_budget is None else start + time_budget
+        sample_deadline = None if time_budget is None else start + sample_share * time_budget
+        first = True
+        while self._samples_done < len(self._samples) and self.progress < target_progress and sample_share > 0:
+            if not first and sample_deadline is not None and time.perf_counter() >= sample_deadline:
+                break
+            self._compute_sample(int(self._samples[self._samples_done]))
+            self._samples_done += 1
+            self._work_done += len(self.profile)
+            first = False
+        while self._diagonals_done < len(self._diagonals) and self.progress < target_progress:
+            if not first and deadline is not None and time.perf_counter() >= deadline:
+                break
+            k = int(self._diagonals[self._diagonals_done])
+            self._compute_diagonal(k)
+            self._diagonals_done += 1
+            self._work_done += len(self.profile) - k
+            first = False
+        return self.profile
+
+    def get_discords(self, k=4, exclusion_zone=None):
+        """ Returns the positions of the k subsequences farthest from their nearest neighbor found so far,
+            at least exclusion_zone (default the window) apart
+        """
+        return _get_top_discords(self.profile, k, self.window if exclusion_zone is None else exclusion_zone)
+
+    def to_profile(self):
+        """ Returns the profile as a dict like the one of mp.compute(series, window), for mp.discover and
+            mp.visualize
+        """
+        return {
+            'mp': self.profile.copy(), 'pi': self.profile_index.copy(), 'rmp': None, 'rpi': None, 'lmp': None,
+            'lpi': None, 'metric': 'euclidean', 'w': self.window, 'ez': self.exclusion_zone, 'join': False,
+            'sample_pct': self.progress, 'data': {'ts': self.series, 'query': None}, 'class': 'MatrixProfile',
+            'algorithm': 'scrimp++',
+        }
+
+
+def _get_series_discords(event_id, series, window, k, exclusion_zone, normalize):
+    # Worker: exact profile of one event's count series, and its k discords as (event id, position, score).
+    # Subsequences at distance 0 of their nearest neighbor repeat exactly, they are no discords.
+    # The diagonals alone give the exact profile, PRESCRIMP samples would only add work
+    anytime_profile = AnytimeMatrixProfile(series, window, random_state=0, normalize=normalize)
+    anytime_profile.refine(sample_share=0)
+    discords = anytime_profile.get_discords(k=k, exclusion_zone=exclusion_zone)
+    return [(event_id, int(position), float(anytime_profile.profile[position])) for position in discords
+            if anytime_profile.profile[position] > 0]
+
+
+def rank_event_discords(counts, window, k=3, exclusion_zone=None, normalize=False, n_jobs=None, executor=None):
+
+    """
+    Profiles the count series of every event in parallel, and ranks their discords together.
+
+    Each column of counts (see build_event_count_matrix) is profiled exactly with the same window (see
+    AnytimeMatrixProfile). The score of a discord is the Euclidean distance between its counts and those of
+    its nearest neighbor, so a burst of events scores by how many more (or fewer) events it has than any
+    other part of the series, in counts comparable across events. With normalize, subsequences are compared
+    by shape only: scores are then at most 2 * sqrt(window), and a burst in a series that is flat elsewhere
+    scores exactly sqrt(window), whatever its size. The same exclusion zone keeps the k discords of every
+    series apart. Constant series and subsequences that repeat exactly (score 0) have no discords. Series
+    are profiled in a pool of processes, one task per series.
+
+    Parameters:
+    counts (pd.DataFrame): The count series, a column per event, indexed by time.
+    window (int): The subsequence length, in bins.
+    k (int, optional): The number of discords per event. Default is 3.
+    exclusion_zone (int, optional): The minimum distance between two discords of a series, in bins.
+        Default is None, i.e. the window.
+    normalize (bool, optional): Whether to z-normalize the subsequences. Default is False.
+    n_jobs (int, optional): The number of worker processes, 1 profiles the series in this process.
+        Default is None, i.e. one per CPU.
+    executor (concurrent.futures.Executor, optional): A process pool to use instead of creating one, it
+        isn't shut down. Default is None.
+
+    Returns:
+    pd.DataFrame: The discords of all events, highest score first, with the columns 'Rank' (shared by
+        discords of equal scores), 'EventId', 'Time' (start of the discord), 'Score', 'Index' (bin of the
+        discord in counts) and 'Window'. Series shorter than two windows are skipped.
+
+    Example:
+    >>> counts = build_event_count_matrix(df, bin_width='1min')
+    >>> rank_event_discords(counts, window=10, k=2, n_jobs=8).head()
+       Rank EventId                Time      Score  Index  Window
+    0     1     E24 2016-12-10 10:54:00  53.385391    239      10
+    1     2      E9 2016-12-10 10:54:00  49.899900    239      10
+    ...
+
+    """
+
+    exclusion_zone = window if exclusion_zone is None else exclusion_zone
+    n_jobs = n_jobs or os.cpu_count()
+    tasks = [(event_id, series, window, k, exclusion_zone, normalize)
+             for event_id, series in ((event_id, counts[event_id].to_numpy(dtype=np.float64))
+                                      for event_id in counts.columns)
+             if len(series) >= 2 * window and np.ptp(series) > 0]
+
+    if executor is None and n_jobs == 1:
+        results = [_get_series_discords(*task) for task in tasks]
+    else:
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=n_jobs)
+        try:
+            results = [future.result() for future in [executor.submit(_get_series_discords, *task) for task in tasks]]
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    discords = pd.DataFrame([discord for result in results for discord in result],
+                            columns=['EventId', 'Index', 'Score']).astype({'Index': np.int64, 'Score': np.float64})
+    discords['Time'] = counts.index[discords['Index'].to_numpy()]
+    discords['Window'] = window
+    discords = discords.sort_values(['Score', 'EventId', 'Index'], ascending=[False, True, True], kind='stable', ignore_index=True)
+    discords['Rank'] = discords['Score'].rank(method='min', ascending=False).astype(np.int64)
+    return discords[['Rank', 'EventId', 'Time', 'Score', 'Index', 'Window']]
 
 
 class MatrixProfileAnalyzer: 
@@ -59,6 +865,20 @@ class MatrixProfileAnalyzer:
         - 'TimeFull': Timestamps in the format '%d-%m-%Y %H:%M:%S'.
         - 'EventId': Unique event identifiers.
         - 'Content': Event content.
+    raw_log (RawLogReader, optional): Reader of the parsed log file, used to attach the raw lines of
+        entries returned by get_df_entries when df only has 'Log Offset' and 'Log Length' columns
+        (parsed with store_original_log=False). Default is None.
+    profile_cache (ProfileCache, optional): Persistent cache of the profiles computed by get_profile, so
+        analyzing the same log again doesn't recompute them. Default is None.
+    n_jobs (int, optional): The number of processes pan matrix profiles (several or default windows) are
+        computed with, see compute_pan_profile. None means one per CPU. Default is 1, i.e. mp.compute alone.
+    executor (concurrent.futures.Executor, optional): A process pool for pan matrix profiles, used instead
+        of creating one per profile. Default is None.
+
+    The entries are kept sorted by 'TimeFull' (rows out of order are sorted once, stably), so time ranges
+    are found by binary search over time_index, a sorted pd.DatetimeIndex. The columns analyzed are kept as
+    numpy arrays: time_series (datetime64[ns]), event_numbers (int32, e.g. 27 for 'E27') and event_series
+    (the same as float64, the input of mp.compute).
 
     Raises:
     AssertionError: If the DataFrame lacks required columns or if 'TimeFull' column format is incorrect.
@@ -73,83 +893,366 @@ class MatrixProfileAnalyzer:
     
     """
 
-    def __init__(self, df): 
+    def __init__(self, df, raw_log=None, profile_cache=None, n_jobs=1, executor=None): 
         self.df = df 
+        self.raw_log = raw_log
+        self.profile_cache = profile_cache
+        self.n_jobs = n_jobs
+        self.executor = executor
 
         assert 'TimeFull' in df.columns, "DataFrame doesn't have 'TimeFull' column"
-        assert pd.to_datetime(df['TimeFull'], format='%d-%m-%Y %H:%M:%S', errors='coerce').notna().all(), \
-            "Column 'TimeFull' is not in the format '%d-%m-%Y %H:%M:%S'"
+        # Parsed once, for the check and the time index (a no-op for datetime columns)
+        time_full = pd.to_datetime(df['TimeFull'], format='%d-%m-%Y %H:%M:%S', errors='coerce')
+        assert time_full.notna().all(), "Column 'TimeFull' is not in the format '%d-%m-%Y %H:%M:%S'"
         assert 'EventId' in df.columns, "DataFrame doesn't have 'EventId' column"
         assert 'Content' in df.columns, "DataFrame doesn't have 'content' column"
 
         print(f"(matrix_profile.py) Dataframe is in correct format. Ready to go!")
 
-        self.time_series = self.df['TimeFull']
+        self.time_index = pd.DatetimeIndex(time_full).as_unit('ns')
+        if not self.time_index.is_monotonic_increasing:
+            order = np.argsort(self.time_index.to_numpy(), kind='stable')
+            self.df = self.df.iloc[order]
+            self.time_index = self.time_index[order]
+            print(f"(matrix_profile.py) Entries sorted by 'TimeFull'")
+
+        # Profiles computed so far, by (windows, subset), shared by discord and motif discovery
+        self.profiles = {}
+
+        self.time_series = self.time_index.to_numpy()
+        self.eventid_series = self.df['EventId']
+
+        # The event series is what mp.compute works on
+        self.event_numbers = _get_event_numbers(self.eventid_series)
+        self.event_series = self.event_numbers.astype(np.float64)
+
+        # Profile updated by append_entries, see start_streaming
+        self.streaming_profile = None
+
+        # Approximate profiles refined by later calls, by (window, subset), see get_anytime_profile
+        self.anytime_profiles = {}
+
+
+    def get_anytime_profile(self, window, time_budget=2.0, target_progress=1.0, subset=None): 
+
+        """
+        Returns an approximate profile of the event series, refined within a time budget.
+
+        The AnytimeMatrixProfile of a window and subset is kept, so every call refines the previous result
+        further until it is exact (progress 1.0).
+
+        Parameters:
+        window (int): The subsequence length.
+        time_budget (float, optional): The seconds to spend refining in this call. Default is 2.0.
+        target_progress (float, optional): See AnytimeMatrixProfile.refine. Default is 1.0.
+        subset (slice or tuple, optional): The part of the event series, as a slice of positions or a
+            (start_time, end_time) tuple (see get_time_slice). Default is None, i.e. all.
+
+        Returns:
+        AnytimeMatrixProfile: The profile, its progress tells how far from exact it is.
+
+        Example:
+        >>> analyzer = MatrixProfileAnalyzer(df)
+        >>> anytime_profile = analyzer.get_anytime_profile(window=32, time_budget=2.0)
+        >>> print(f"{anytime_profile.progress:.0%} done, discords: {anytime_profile.get_discords(k=3)}")
+
+        """
+
+        subset = self._get_subset_slice(subset)
+        key = (int(window), subset.start, subset.stop)
+        if key not in self.anytime_profiles:
+            self.anytime_profiles[key] = AnytimeMatrixProfile(self.event_series[subset], window, random_state=0)
+        anytime_profile = self.anytime_profiles[key]
+        anytime_profile.refine(time_budget=time_budget, target_progress=target_progress)
+        print(f"(matrix_profile.py) Approximate profile at {anytime_profile.progress:.1%} of the work")
+        return anytime_profile
+
+
+    def get_event_discords(self, window, bin_width='1min', k=3, exclusion_zone=None, normalize=False): 
+
+        """
+        Ranks the discords of the count series of every event of the log together.
+
+        The log is binned per event (see build_event_count_matrix) and every event's series is profiled
+        in the analyzer's pool (n_jobs, executor), see rank_event_discords.
+
+        Parameters:
+        window (int): The subsequence length, in bins.
+        bin_width (str or pd.Timedelta, optional): The width of the bins. Default is '1min'.
+        k (int, optional): The number of discords per event. Default is 3.
+        exclusion_zone (int, optional): The minimum distance between two discords of an event, in bins.
+            Default is None, i.e. the window.
+        normalize (bool, optional): Whether to compare the counts by shape only. Default is False.
+
+        Returns:
+        pd.DataFrame: The discords, highest score first, with the columns 'Rank', 'EventId', 'Time',
+            'Score', 'Index' and 'Window'.
+
+        Example:
+        >>> analyzer = MatrixProfileAnalyzer(df, n_jobs=8)
+        >>> analyzer.get_event_discords(window=30, bin_width='1min').head(10)
+
+        """
+
+        counts = build_event_count_matrix(self.df, bin_width=bin_width)
+        return rank_event_discords(counts, window, k=k, exclusion_zone=exclusion_zone, normalize=normalize,
+                                   n_jobs=self.n_jobs, executor=self.executor)
+
+
+    def start_streaming(self, window, exclusion_zone=None): 
+
+        """
+        Starts an incremental matrix profile of the event series, updated by append_entries.
+
+        Parameters:
+        window (int): The subsequence length.
+        exclusion_zone (int, optional): See StreamingMatrixProfile. Default is None.
+
+        Returns:
+        StreamingMatrixProfile: The profile of the current event series, also kept as self.streaming_profile.
+
+        Example:
+        >>> analyzer = MatrixProfileAnalyzer(df)
+        >>> streaming_profile = analyzer.start_streaming(window=32)
+        >>> scores = analyzer.append_entries(new_df)
+        >>> streaming_profile.get_discords(k=3)
+
+        """
+
+        self.streaming_profile = StreamingMatrixProfile(window, self.event_series, exclusion_zone=exclusion_zone)
+        return self.streaming_profile
+
+
+    def append_entries(self, df): 
+
+        """
+        Appends new log entries (e.g. lines tailed from a live log) to the analyzer.
+
+        The entries are added to self.df, the time index and the event series. With a streaming profile
+        (see start_streaming), it is updated in O(n) per entry instead of recomputing the profile.
+
+        Parameters:
+        df (pd.DataFrame): The new entries, with the columns of the analyzer's DataFrame, in time order and
+            not older than the last entry.
+
+        Returns:
+        np.ndarray: The streaming profile values (discord scores) of the subsequences ending at the new
+            entries, or None without a streaming profile.
+
+        Raises:
+        ValueError: If the new entries are older than the last entry or not in time order.
+
+        """
+
+        time_full = pd.to_datetime(df['TimeFull'], format='%d-%m-%Y %H:%M:%S', errors='coerce')
+        assert time_full.notna().all(), "Column 'TimeFull' is not in the format '%d-%m-%Y %H:%M:%S'"
+        times = pd.DatetimeIndex(time_full).as_unit('ns')
+        if not times.is_monotonic_increasing or (len(times) and len(self.time_index) and times[0] < self.time_index[-1]):
+            raise ValueError("Appended entries must be in time order and not older than the last entry")
+
+        event_numbers = _get_event_numbers(df['EventId'])
+        self.df = concat_parsed_logs([self.df, df.copy()])
         self.eventid_series = self.df['EventId']
+        self.time_index = self.time_index.append(times)
+        self.time_series = self.time_index.to_numpy()
+        self.event_numbers = np.concatenate([self.event_numbers, event_numbers])
+        self.event_series = self.event_numbers.astype(np.float64)
 
-        self.event_series = [] 
-        for event in self.eventid_series: 
-            self.event_series.append(int(str(event)[1:]))
+        if self.streaming_profile is None:
+            return None
+        return self.streaming_profile.extend(event_numbers)
 
-        self.time_series = [np.datetime64(ts) for ts in self.time_series] # TODO: may not need this line!
 
+    def get_time_slice(self, start_time=None, end_time=None): 
 
-    def get_discords(self, k=4, windows=None, subset=None): 
+        """
+        Returns the positions of the entries between two times, by binary search over the sorted time index.
+
+        Parameters:
+        start_time (str or pd.Timestamp, optional): The first time of the range, included, as a timestamp or a
+            string in the format '%d-%m-%Y %H:%M:%S'. Default is None, i.e. from the first entry.
+        end_time (str or pd.Timestamp, optional): The last time of the range, included. Default is None,
+            i.e. up to the last entry.
+
+        Returns:
+        slice: The positions (in self.df, self.event_series, ...) of the entries in the range.
+
+        Example:
+        >>> analyzer = MatrixProfileAnalyzer(df)
+        >>> incident = pd.Timestamp('2016-12-10 09:00:00')
+        >>> positions = analyzer.get_time_slice(incident - pd.Timedelta('5min'), incident + pd.Timedelta('5min'))
+        >>> analyzer.df.iloc[positions]
+
+        """
+
+        start = 0 if start_time is None else self.time_index.searchsorted(parse_time(start_time), side='left')
+        end = len(self.time_index) if end_time is None else \
+            self.time_index.searchsorted(parse_time(end_time), side='right')
+        return slice(int(start), int(max(start, end)))
+
+
+    def _get_subset_slice(self, subset): 
+
+        # Positions of a subset given as a slice of positions or a (start_time, end_time) tuple
+        if subset is None:
+            return slice(0, len(self.event_series))
+        if isinstance(subset, slice):
+            start, stop, step = subset.indices(len(self.event_series))
+            if step != 1:
+                raise ValueError("The subset must be a contiguous slice")
+            return slice(start, max(start, stop))
+        if isinstance(subset, tuple) and len(subset) == 2:
+            return self.get_time_slice(*subset)
+        raise ValueError(f"The subset must be a slice or a (start_time, end_time) tuple, not {subset!r}")
+
+
+    def get_profile(self, windows=None, subset=None): 
+
+        """
+        Computes the MatrixProfile profile of the event series, once per window configuration and subset.
+
+        Profiles are memoized in self.profiles, so get_discords and get_motifs on the same windows and
+        subset compute it only once. Discovery works on a copy, the memoized profile is left untouched.
+        With a profile_cache, profiles computed for the same event series before (e.g. by an earlier run
+        on the same log) are loaded from disk instead.
+
+        Parameters:
+        windows (int or list, optional): The window size(s) for MatrixProfile computation. Default is None,
+            i.e. a pan matrix profile over the default window range of mp.compute.
+        subset (slice or tuple, optional): The part of the event series, as a slice of positions or a
+            (start_time, end_time) tuple (see get_time_slice). Default is None, i.e. all.
+
+        Returns:
+        dict: The MatrixProfile profile of the subset.
+
+        Raises:
+        ValueError: If subset is neither a slice nor a (start_time, end_time) tuple.
+
+        Example:
+        >>> analyzer = MatrixProfileAnalyzer(df)
+        >>> profile = analyzer.get_profile(windows=[5, 10, 15])
+        >>> analyzer.get_profile(windows=[5, 10, 15]) is profile
+        True
+
+        """
+
+        subset = self._get_subset_slice(subset)
+        key = (tuple(np.atleast_1d(windows).tolist()) if windows is not None else None, subset.start, subset.stop)
+        if key not in self.profiles:
+            event_series = self.event_series[subset]
+            parallel = (self.n_jobs != 1 or self.executor is not None) and \
+                (windows is None or np.ndim(windows) == 1 and len(windows) > 1)
+            algorithm = 'compute_pan_profile' if parallel else 'mp.compute'
+            cache_key = self.profile_cache.get_key(event_series, windows, algorithm) \
+                if self.profile_cache is not None else None
+            profile = self.profile_cache.get(cache_key) if self.profile_cache is not None else None
+            if profile is None:
+                if parallel:
+                    profile = compute_pan_profile(event_series, windows, n_jobs=self.n_jobs, executor=self.executor)
+                elif windows is not None: profile = mp.compute(event_series, windows)
+                else: profile = mp.compute(event_series)
+                if self.profile_cache is not None:
+                    self.profile_cache.put(cache_key, profile)
+            else:
+                print(f"(matrix_profile.py) Loaded profile {cache_key[:12]} from the cache")
+            self.profiles[key] = profile
+        return self.profiles[key]
+
+
+    def _get_window(self, windows):
+
+        # The single window of an approximate profile
+        if np.ndim(windows) == 0 and windows:
+            return int(windows)
+        if windows is not None and np.ndim(windows) == 1 and len(windows) == 1:
+            return int(windows[0])
+        raise ValueError("Approximate profiles (time_budget) need a single window")
+
+
+    def get_discords(self, k=4, windows=None, subset=None, time_budget=None): 
 
         """
         Extracts and returns MatrixProfile profile and discords.
 
-        This method computes the MatrixProfile profile and identifies discords in the event series.
-        Discords are subsequences that significantly differ from the rest and may indicate anomalies.
+        This method computes (or reuses, see get_profile) the MatrixProfile profile and identifies discords
+        in the event series. Discords are subsequences that significantly differ from the rest and may indicate anomalies.
 
         Parameters:
         k (int, optional): The number of discords to identify. Default is 4.
         windows (list, optional): A list of window sizes for MatrixProfile computation. Default is None.
-        subset (slice, optional): A slice indicating a subset of the event series to analyze. Default is None.
+        subset (slice or tuple, optional): The part of the event series to analyze, as a slice of positions or
+            a (start_time, end_time) tuple (see get_time_slice). Default is None, i.e. all.
+        time_budget (float, optional): When given, the profile is approximate (see get_anytime_profile),
+            refined for time_budget seconds more on every call, for a single window. Default is None, i.e. exact.
 
         Returns:
         dict or None: A dictionary containing the MatrixProfile profile and a list of discords if successful.
-            Returns None if an error occurs (e.g., when the window size is too small).
+            Returns None and no discords if an error occurs (e.g., when the window size is too small). The profile covers the
+            subset only, the discords are positions (or (window, position) pairs for a pan matrix profile)
+            in the whole event series (and self.df).
+
+        Raises:
+        ValueError: If subset is neither a slice nor a (start_time, end_time) tuple, or with time_budget and
+            not a single window.
 
         Example:
         >>> analyzer = MatrixProfileAnalyzer(df)
         >>> profile, discords = analyzer.get_discords(k=3, windows=[5, 10, 15])
+        >>> profile, discords = analyzer.get_discords(k=3, windows=32, time_budget=2.0)
+        >>> profile, discords = analyzer.get_discords(k=3, subset=('10-12-2016 08:55:00', '10-12-2016 09:05:00'))
         >>> if profile is not None:
         ...     print(f"MatrixProfile Profile: {profile['matrix_profile']}")
         ...     print(f"Discords: {discords}")
 
         """
 
+        subset = self._get_subset_slice(subset)
+        window = self._get_window(windows) if time_budget is not None else None
+
         try: 
-            exclusion_zone = int(len(self.event_series)/10)
+            exclusion_zone = int((subset.stop - subset.start)/10)
 
-            if windows: profile = mp.compute(self.event_series, windows)
-            else: profile = mp.compute(self.event_series)
+            if time_budget is not None:
+                profile = self.get_anytime_profile(window, time_budget=time_budget, subset=subset).to_profile()
+            else:
+                profile = copy.deepcopy(self.get_profile(windows, subset))
 
             profile = mp.discover.discords(profile, k=k, exclusion_zone=exclusion_zone)
-            discords = profile['discords']
-            return profile, discords
         
-        except: 
+        except Exception: 
             print("(matrix_profile.py) Error occured (likely window too small)")
-            return None, None 
+            return None, []
 
+        # Shifted outside of the try, an error here is a bug and must not pass for a too small window
+        discords = [_shift_index(discord, subset.start) for discord in profile['discords']]
+        return profile, discords
 
-    def get_motifs(self, k=4, subset=None): 
+
+    def get_motifs(self, k=4, subset=None, windows=None, time_budget=None): 
 
         """
         Extracts and returns MatrixProfile profile and motifs.
 
-        This method computes the MatrixProfile profile and identifies motifs in the event series.
-        Motifs are subsequences that appear as repeating patterns within the data.
+        This method computes (or reuses, see get_profile) the MatrixProfile profile and identifies motifs
+        in the event series. Motifs are subsequences that appear as repeating patterns within the data.
 
         Parameters:
         k (int, optional): The number of motifs to identify. Default is 4.
-        subset (slice, optional): A slice indicating a subset of the event series to analyze. Default is None.
+        subset (slice or tuple, optional): The part of the event series to analyze, as a slice of positions or
+            a (start_time, end_time) tuple (see get_time_slice). Default is None, i.e. all.
+        windows (list, optional): A list of window sizes for MatrixProfile computation. Default is None.
+        time_budget (float, optional): When given, the profile is approximate (see get_anytime_profile),
+            refined for time_budget seconds more on every call, for a single window. Default is None, i.e. exact.
 
         Returns:
         dict or None: A dictionary containing the MatrixProfile profile and a list of motifs if successful.
-            Returns None if an error occurs (e.g., when the window size is too small).
+            Returns None and no motifs if an error occurs (e.g., when the window size is too small). The profile covers the
+            subset only, the motifs and their neighbors are positions (or (window, position) pairs for a pan
+            matrix profile) in the whole event series (and self.df).
+
+        Raises:
+        ValueError: If subset is neither a slice nor a (start_time, end_time) tuple, or with time_budget and
+            not a single window.
 
         Example:
         >>> analyzer = MatrixProfileAnalyzer(df)
@@ -159,16 +1262,23 @@ class MatrixProfileAnalyzer:
         ...     print(f"Motifs: {motifs}")
 
         """
+        subset = self._get_subset_slice(subset)
+        window = self._get_window(windows) if time_budget is not None else None
+
         try: 
-            profile = mp.compute(self.event_series)
+            if time_budget is not None:
+                profile = self.get_anytime_profile(window, time_budget=time_budget, subset=subset).to_profile()
+            else:
+                profile = copy.deepcopy(self.get_profile(windows, subset))
             profile = mp.discover.motifs(profile, k=k)
-
-            motifs = profile['motifs']
-            return profile, motifs
     
-        except: 
+        except Exception: 
             print("(matrix_profile.py) Error occured (likely window too small)")
-            return None, None 
+            return None, []
+
+        motifs = [{key: [_shift_index(index, subset.start) for index in indices] for key, indices in motif.items()}
+                  for motif in profile['motifs']]
+        return profile, motifs
 
 
     def get_arr_subset(self, time_arr, event_arr, range): 
@@ -177,15 +1287,17 @@ class MatrixProfileAnalyzer:
         Returns a subset of event_arr contingent on time_arr and a time range.
 
         This method extracts a subset of event_arr based on the corresponding time_arr and a specified
-        time range defined by start_time and end_time.
+        time range defined by start_time and end_time (both included). Sorted times are binary searched,
+        others are compared all at once.
 
         Parameters:
-        time_arr (list or pd.Series): A list or Series containing timestamps.
+        time_arr (list or pd.Series): A list or Series containing timestamps, or strings in the format
+            '%d-%m-%Y %H:%M:%S'.
         event_arr (list or pd.Series): A list or Series containing event data.
         time_range (tuple): A tuple specifying the time range as (start_time, end_time).
 
         Returns:
-        list: A subset of event_arr within the specified time range.
+        list: A subset of event_arr within the specified time range (an array or Series for an array or Series).
 
         Example:
         >>> analyzer = MatrixProfileAnalyzer(df)
@@ -194,21 +1306,26 @@ class MatrixProfileAnalyzer:
         >>> time_range = ('03-03-2016 10:00:00', '04-04-2016 11:00:00')
         >>> subset = analyzer.get_arr_subset(time_series, event_series, time_range)
         >>> print(subset)
-        ['Event1', 'Event2']
+        ['Event1', 'Event2', 'Event3']
 
         In this example, the method is used to extract a subset of 'event_series' within the specified
-        time range, resulting in ['Event1', 'Event2'].
+        time range, resulting in ['Event1', 'Event2', 'Event3'].
 
         """
 
-        start_time = range[0]; end_time = range[1]
+        start_time = parse_time(range[0]); end_time = parse_time(range[1])
 
-        subset = [] 
-        for idx, timestamp in enumerate(time_arr): 
-            if start_time <= timestamp <= end_time:
-                subset.append(event_arr[idx])
+        times = pd.DatetimeIndex(pd.to_datetime(time_arr, format='%d-%m-%Y %H:%M:%S'))
+        if times.is_monotonic_increasing:
+            positions = slice(times.searchsorted(start_time, side='left'), times.searchsorted(end_time, side='right'))
+        else:
+            positions = np.flatnonzero((times >= start_time) & (times <= end_time))
 
-        return subset
+        if isinstance(event_arr, pd.Series):
+            return event_arr.iloc[positions]
+        if isinstance(event_arr, list):
+            return event_arr[positions] if isinstance(positions, slice) else [event_arr[idx] for idx in positions]
+        return np.asarray(event_arr)[positions]
         
 
     def get_df_entries(self, target, window=5, after=False):
@@ -226,7 +1343,8 @@ class MatrixProfileAnalyzer:
             around the target index. Default is False.
 
         Returns:
-        pd.DataFrame: A slice of the DataFrame containing entries within the specified window.
+        pd.DataFrame: A slice of the DataFrame containing entries within the specified window. When the
+            analyzer has a raw_log, the raw lines of the slice are fetched and added as 'Original Log'.
 
         Example:
         >>> analyzer = MatrixProfileAnalyzer(df)
@@ -256,6 +1374,10 @@ class MatrixProfileAnalyzer:
         
         # Slice the DataFrame to get the entries within the window
         window_entries = self.df.iloc[start_idx:end_idx + 1]  # Adding 1 to include the end index
+
+        # Only the raw lines of the few entries shown are read from the log file
+        if self.raw_log is not None and 'Log Offset' in window_entries.columns:
+            window_entries = window_entries.assign(**{'Original Log': self.raw_log.get_lines(window_entries)})
         
         return window_entries
 
@@ -293,7 +1415,7 @@ class MatrixProfileAnalyzer:
         plt.title('Timestamps vs. Event IDs')
 
         plt.xticks(rotation=45)
-        plt.xlim(min(self.time_series), max(self.time_series))
+        plt.xlim(self.time_series.min(), self.time_series.max())
 
         plt.grid()
         plt.tight_layout()
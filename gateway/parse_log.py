@@ -15,78 +15,93 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import argparse
+import ast
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import mmap
 import os
+import queue
+import sys
+import threading
+import numpy as np
 import pandas as pd
 from drain3 import TemplateMiner
+from drain3.persistence_handler import PersistenceHandler
 from dateutil import parser
-import time
+from datetime import datetime
 import csv
+import glob
 import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 
 log_format = '<Date> <Time> <Pid> <Level> <Component>: <Content>'
 
-def get_log_format(filename):
-    benchmark_settings = {
-        "HDFS": {
-            "log_format": "<Date> <Time> <Pid> <Level> <Component>: <Content>",
-            "regex": [r"blk_-?\d+", r"(\d+\.){3}\d+(:\d+)?"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "Hadoop": {
-            "log_format": "<Date> <Time> <Level> \[<Process>\] <Component>: <Content>",
-            "regex": [r"(\d+\.){3}\d+"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "Spark": {
-            "log_format": "<Date> <Time> <Level> <Component>: <Content>",
-            "regex": [r"(\d+\.){3}\d+", r"\b[KGTM]?B\b", r"([\w-]+\.){2,}[\w-]+"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "Zookeeper": {
-            "log_format": "<Date> <Time> - <Level>  \[<Node>:<Component>@<Id>\] - <Content>",
-            "regex": [r"(/|)(\d+\.){3}\d+(:\d+)?"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "BGL": {
-            "log_file": "BGL/BGL_2k.log",
-            "log_format": "<Label> <Timestamp> <Date> <Node> <Time> <NodeRepeat> <Type> <Component> <Level> <Content>",
-            "regex": [r"core\.\d+"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "HPC": {
-            "log_file": "HPC/HPC_2k.log",
-            "log_format": "<LogId> <Node> <Component> <State> <Time> <Flag> <Content>",
-            "regex": [r"=\d+"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "Thunderbird": {
-            "log_file": "Thunderbird/Thunderbird_2k.log",
-            "log_format": "<Label> <Timestamp> <Date> <User> <Month> <Day> <Time> <Location> <Component>(\[<PID>\])?: <Content>",
-            "regex": [r"(\d+\.){3}\d+"],
-            "st": 0.5,
-            "depth": 4,
-        },
-        "Windows": {
-            "log_file": "Windows/Windows_2k.log",
-            "log_format": "<Date> <Time>, <Level>                  <Component>    <Content>",
-            "regex": [r"0x.*?\s"],
-            "st": 0.7,
-            "depth": 5,
-        },
-        "Linux": {
-            "log_file": "Linux/Linux_2k.log",
-            "log_format": "<Month> <Date> <Time> <Level> <Component>(\[<PID>\])?: <Content>",
-            "regex": [r"(\d+\.){3}\d+", r"\d{2}:\d{2}:\d{2}"],
-            "st": 0.39,
-            "depth": 6,
-        },
+benchmark_settings = {
+    "HDFS": {
+        "log_format": "<Date> <Time> <Pid> <Level> <Component>: <Content>",
+        "regex": [r"blk_-?\d+", r"(\d+\.){3}\d+(:\d+)?"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "Hadoop": {
+        "log_format": "<Date> <Time> <Level> \[<Process>\] <Component>: <Content>",
+        "regex": [r"(\d+\.){3}\d+"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "Spark": {
+        "log_format": "<Date> <Time> <Level> <Component>: <Content>",
+        "regex": [r"(\d+\.){3}\d+", r"\b[KGTM]?B\b", r"([\w-]+\.){2,}[\w-]+"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "Zookeeper": {
+        "log_format": "<Date> <Time> - <Level>  \[<Node>:<Component>@<Id>\] - <Content>",
+        "regex": [r"(/|)(\d+\.){3}\d+(:\d+)?"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "BGL": {
+        "log_file": "BGL/BGL_2k.log",
+        "log_format": "<Label> <Timestamp> <Date> <Node> <Time> <NodeRepeat> <Type> <Component> <Level> <Content>",
+        "regex": [r"core\.\d+"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "HPC": {
+        "log_file": "HPC/HPC_2k.log",
+        "log_format": "<LogId> <Node> <Component> <State> <Time> <Flag> <Content>",
+        "regex": [r"=\d+"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "Thunderbird": {
+        "log_file": "Thunderbird/Thunderbird_2k.log",
+        "log_format": "<Label> <Timestamp> <Date> <User> <Month> <Day> <Time> <Location> <Component>(\[<PID>\])?: <Content>",
+        "regex": [r"(\d+\.){3}\d+"],
+        "st": 0.5,
+        "depth": 4,
+    },
+    "Windows": {
+        "log_file": "Windows/Windows_2k.log",
+        "log_format": "<Date> <Time>, <Level>                  <Component>    <Content>",
+        "regex": [r"0x.*?\s"],
+        "st": 0.7,
+        "depth": 5,
+    },
+    "Linux": {
+        "log_file": "Linux/Linux_2k.log",
+        "log_format": "<Month> <Date> <Time> <Level> <Component>(\[<PID>\])?: <Content>",
+        "regex": [r"(\d+\.){3}\d+", r"\d{2}:\d{2}:\d{2}"],
+        "st": 0.39,
+        "depth": 6,
+    },
     "Android": {
         "log_file": "Android/Android_2k.log",
         "log_format": "<Date> <Time>  <Pid>  <Tid> <Level> <Component>: <Content>",
@@ -145,25 +160,142 @@ def get_log_format(filename):
         "st": 0.7,
         "depth": 6,
     },
-    }
+}
+
+def get_log_format_name(filename, log_file_path=None):
+    """ Function to find the benchmark_settings entry of a log, from its filename first and otherwise
+        from its content when log_file_path is given. Returns None when no format fits.
+    """
     for key in benchmark_settings:
         if re.search(rf'{key}(?=[_\W]|$)', filename):
-            return benchmark_settings[key]["log_format"]
+            return key
+
+    if log_file_path is not None:
+        return log_format_registry.detect(log_file_path)
+    return None
+
+def get_log_format(filename, log_file_path=None):
+    key = get_log_format_name(filename, log_file_path=log_file_path)
+    if key is not None:
+        return benchmark_settings[key]["log_format"]
 
     print("Unable to find the logformat ! This can lead to errors please take care of this:")
     return None
 
-def detect_timestamp_format(log_line):
-    # This function tries to detect the timestamp format from the log line
-    # For simplicity, we assume the timestamp is at the beginning of the log line
-    # You can extend this function to handle more timestamp formats
+# Fields of the log formats in benchmark_settings that make up the timestamp, in log order
+TIMESTAMP_HEADERS = ['Month', 'Date', 'Day', 'Time']
+
+# Candidate timestamp formats of the joined TIMESTAMP_HEADERS fields, tried in order by infer_timestamp_format,
+# and of groups of these fields for format detection (see LogFormatRegistry)
+TIMESTAMP_FORMATS = [
+    '%b %d %H:%M:%S',           # OpenSSH, Linux, Mac: "Dec 10 06:55:46"
+    '%y%m%d %H%M%S',            # HDFS: "081109 203615"
+    '%Y-%m-%d %H:%M:%S,%f',     # Hadoop, Zookeeper: "2015-10-18 18:01:47,978"
+    '%Y-%m-%d %H:%M:%S.%f',     # OpenStack: "2017-05-16 00:00:00.008"
+    '%Y-%m-%d %H:%M:%S',        # Windows: "2016-09-28 04:30:30"
+    '%y/%m/%d %H:%M:%S',        # Spark: "17/06/09 20:10:40"
+    '%m-%d %H:%M:%S.%f',        # Android: "03-17 16:13:38.811"
+    '%Y%m%d-%H:%M:%S:%f',       # HealthApp: "20171223-22:15:29:606"
+    '%a %b %d %H:%M:%S %Y',     # Apache: "Sun Dec 04 04:47:44 2005"
+    '%m.%d %H:%M:%S',           # Proxifier: "10.30 16:49:06"
+    '%Y.%m.%d',                 # BGL, Thunderbird dates: "2005.06.03"
+    '%Y-%m-%d-%H.%M.%S.%f',     # BGL times: "2005-06-03-15.42.50.675872"
+    '%s',                       # HPC: "1077804742", seconds since the epoch (UNIX_TIME_FORMAT)
+    '%Y-%m-%d',
+    '%H:%M:%S',
+]
+
+# Pseudo-format of TIMESTAMP_FORMATS for unix times, which strptime can't parse, see to_datetime
+UNIX_TIME_FORMAT = '%s'
+
+def has_year(timestamp_format):
+    """ Function to tell whether the timestamps of a TIMESTAMP_FORMATS entry record their year
+    """
+    return '%Y' in timestamp_format or '%y' in timestamp_format or timestamp_format == UNIX_TIME_FORMAT
+
+def _add_default_year(timestamp_strings, timestamp_format, years=None):
+    # Timestamps without a year are placed in years (see get_year_starts), by default like dateutil in the
+    # current year
+    if has_year(timestamp_format):
+        return timestamp_strings, timestamp_format
+    if years is None or np.isscalar(years):
+        return str(datetime.now().year if years is None else years) + ' ' + timestamp_strings, '%Y ' + timestamp_format
+    years = pd.Series(years, index=timestamp_strings.index).astype(str)
+    return years.str.cat(timestamp_strings, sep=' '), '%Y ' + timestamp_format
+
+def to_datetime(timestamp_strings, timestamp_format, years=None):
+    """ Function to parse a Series of timestamp strings with a TIMESTAMP_FORMATS entry, NaT where they don't match.
+        years (one or one per row) is the year of formats without one, the current year by default.
+    """
+    if timestamp_format == UNIX_TIME_FORMAT:
+        # Only 9 or 10 digits (2001 to 2286), so that other numbers such as pids aren't taken for times
+        unix_times = timestamp_strings.where(timestamp_strings.str.fullmatch(r'\d{9,10}', na=False))
+        return pd.to_datetime(pd.to_numeric(unix_times, errors='coerce'), unit='s')
+    strings, full_format = _add_default_year(timestamp_strings, timestamp_format, years)
+    return pd.to_datetime(strings, format=full_format, errors='coerce')
+
+def get_year_rollovers(months, previous_month=None):
+    """ Function to count the new years since the first entry (or since previous_month, the month of the entry
+        before), counting the month going back by more than 6 (e.g. Dec -> Jan) as a new year
+    """
+    return np.cumsum(np.diff(months, prepend=months[0] if previous_month is None else previous_month) < -6)
+
+def infer_first_year(last_month, total_rollovers, reference_time=None):
+    """ Function to find the year of the first entry of a log without years: the last entry is taken to be
+        the most recent date up to reference_time (now by default), a last entry later in the year than the
+        reference time was written the year before
+    """
+    reference_time = pd.Timestamp.now() if reference_time is None else pd.Timestamp(reference_time)
+    return reference_time.year - int(last_month > reference_time.month) - int(total_rollovers)
+
+def get_timestamp_strings(logdf, original_logs):
+    """ Function to assemble the timestamp string of every row from the TIMESTAMP_HEADERS fields,
+        falling back to the first word of the raw line when the log format has none of them
+    """
+    columns = [header for header in logdf.columns if header in TIMESTAMP_HEADERS]
+    if not columns:
+        return pd.Series(original_logs, index=logdf.index, dtype=object).str.split(n=1).str[0]
+    return logdf[columns[0]].str.cat([logdf[column] for column in columns[1:]], sep=' ')
+
+def infer_timestamp_format(timestamp_strings, sample_size=100):
+    """ Function to pick the TIMESTAMP_FORMATS entry that parses most of a sample of timestamp strings,
+        returns None when none of them parses any
+    """
+    sample = pd.Series([t for t in list(timestamp_strings[:sample_size]) if isinstance(t, str)], dtype=object)
+    if sample.empty:
+        return None
+
+    best_format, best_count = None, 0
+    for timestamp_format in TIMESTAMP_FORMATS:
+        count = to_datetime(sample, timestamp_format).notna().sum()
+        if count > best_count:
+            best_format, best_count = timestamp_format, count
+    return best_format
+
+def _parse_timestamp_fallback(timestamp_string):
     try:
-        timestamp_str = log_line.split()[0]
-        timestamp = parser.parse(timestamp_str)
-        return timestamp
-    except:
+        return parser.parse(timestamp_string)
+    except (ValueError, OverflowError, TypeError):
         return None
 
+def parse_timestamps(timestamp_strings, timestamp_format=None, years=None):
+    """ Function to parse a Series of timestamp strings in one vectorized pass with a fixed format,
+        using dateutil only for the rows that don't match it. years is the year of formats without one,
+        see to_datetime.
+    """
+    if timestamp_format is not None:
+        timestamps = to_datetime(timestamp_strings, timestamp_format, years)
+    else:
+        timestamps = pd.Series(pd.NaT, index=timestamp_strings.index, dtype='datetime64[ns]')
+
+    failed = timestamps.isna() & timestamp_strings.notna()
+    if failed.any():
+        timestamps[failed] = pd.to_datetime(timestamp_strings[failed].map(_parse_timestamp_fallback), errors='coerce')
+    return timestamps
+
+def to_unix_time(timestamps):
+    return (timestamps - pd.Timestamp(0)).dt.total_seconds()
+
 def generate_logformat_regex(logformat):
         """ Function to generate regular expression to split log messages
         """
@@ -181,6 +313,143 @@ def generate_logformat_regex(logformat):
         regex = re.compile('^' + regex + '$')
         return headers, regex
 
+def compile_masking_regex(regex_list):
+    """ Function to combine the masking regexes of a log format into one compiled alternation,
+        None if the format has none
+    """
+    if not regex_list:
+        return None
+    return re.compile('|'.join(f'(?:{regex})' for regex in regex_list))
+
+def get_mask(template_miner):
+    """ Function to get the wildcard string of a TemplateMiner, masked content is replaced by it
+        so Drain treats it as a parameter right away
+    """
+    return template_miner.config.mask_prefix + "*" + template_miner.config.mask_suffix
+
+def _parse_timestamp_fields(fields):
+    # Whether the timestamp fields of every row parse, as consecutive groups of fields that each parse with a
+    # TIMESTAMP_FORMATS entry (e.g. "2005.11.09" and "Nov 9 12:01:01" for Thunderbird)
+    columns = list(fields.columns)
+    parsed_groups = {}
+    def parse_group(start, end):
+        if (start, end) not in parsed_groups:
+            strings = fields[columns[start]].str.cat([fields[column] for column in columns[start + 1:end]], sep=' ')
+            parsed = pd.Series(False, index=fields.index)
+            for timestamp_format in TIMESTAMP_FORMATS:
+                if parsed.all():
+                    break
+                parsed[~parsed] = to_datetime(strings[~parsed], timestamp_format).notna()
+            parsed_groups[(start, end)] = parsed
+        return parsed_groups[(start, end)]
+
+    parsed = pd.Series(False, index=fields.index)
+    for cuts in range(2 ** (len(columns) - 1)):
+        if parsed.all():
+            break
+        bounds = [0] + [k + 1 for k in range(len(columns) - 1) if cuts >> k & 1] + [len(columns)]
+        groups = [parse_group(start, end) for start, end in zip(bounds, bounds[1:])]
+        parsed |= pd.concat(groups, axis=1).all(axis=1)
+    return parsed
+
+class LogFormatRegistry:
+    """ The log formats of benchmark_settings, compiled once, with content-based format detection
+
+    detect() samples the first lines of a file and scores every format by the fraction of lines its regex
+    matches with timestamp fields (Month, Date, Day, Time) that parse with TIMESTAMP_FORMATS entries, then by
+    the fraction of lines it matches: a format whose timestamps don't parse can't be detected. Remaining ties
+    go to the most specific format, the one with the most required fields and separators (optional groups
+    don't count, e.g. Mac requires the "[<PID>]" that Linux makes optional). Results are cached per file
+    path, size and modification time. The "regex" list of every format is compiled into one alternation as
+    well, see get_masking_regex. Scoring uses a stricter regex per format, where fields other than Content
+    only span whitespace when they are enclosed in brackets, so lines of unrelated files can't make the lazy
+    groups backtrack exponentially, and where runs of several spaces of the format require several spaces.
+    """
+
+    def __init__(self, settings):
+        self.formats = {}
+        self.masks = {}
+        for key, setting in settings.items():
+            headers, regex = generate_logformat_regex(setting["log_format"])
+            self.formats[key] = (headers, regex, self._detection_regex(setting["log_format"]),
+                                 self._specificity(setting["log_format"]))
+            self.masks[key] = compile_masking_regex(setting.get("regex"))
+        self._detected = {}
+
+    @staticmethod
+    def _detection_regex(log_format):
+        regex = ''
+        splitters = re.split(r'(<[^<>]+>)', log_format)
+        for k, splitter in enumerate(splitters):
+            if k % 2 == 0:
+                regex += re.sub(' +', lambda spaces: r'\s+' if len(spaces.group(0)) == 1 else r'\s{2,}', splitter)
+            else:
+                header = splitter[1:-1]
+                enclosed = splitters[k - 1].endswith(('\\[', '\\('))
+                regex += f'(?P<{header}>.*?)' if header == 'Content' or enclosed else f'(?P<{header}>\\S+?)'
+        return re.compile('^' + regex + '$')
+
+    @staticmethod
+    def _specificity(log_format):
+        # Number of required fields, separator characters and runs of several spaces
+        required = re.sub(r'\((?:\\.|[^()\\])*\)\?', '', log_format)
+        literals = re.sub(r'<[^<>]+>|[\\\s]', '', required)
+        return len(re.findall(r'<[^<>]+>', required)) + len(literals) + len(re.findall(r' {2,}', required))
+
+    def get(self, key):
+        """ Returns the headers and compiled regex of a format
+        """
+        headers, regex, _, _ = self.formats[key]
+        return headers, regex
+
+    def get_masking_regex(self, key):
+        """ Returns the combined masking regex of a format (None if it has no masking regexes)
+        """
+        return self.masks[key]
+
+    def score(self, lines):
+        """ Returns {format: (fraction of lines matched with a parseable timestamp, fraction of lines matched)}
+            for a sample of lines. Timestamps aren't parsed for formats that match fewer lines than another
+            format has parseable timestamps, as they can't be detected: their timestamp fraction is 0.
+        """
+        lines = [line.strip() for line in lines if line.strip()]
+        if not lines:
+            return {}
+
+        matches = {key: [match for match in map(regex.search, lines) if match is not None]
+                   for key, (_, _, regex, _) in self.formats.items()}
+        scores = {}
+        best_timestamp_rate = 0
+        for key in sorted(matches, key=lambda key: (len(matches[key]), self.formats[key][3]), reverse=True):
+            match_rate = len(matches[key]) / len(lines)
+            timestamp_headers = [header for header in self.formats[key][0] if header in TIMESTAMP_HEADERS]
+            timestamp_rate = match_rate
+            if match_rate < best_timestamp_rate or not match_rate:
+                timestamp_rate = 0.0
+            elif timestamp_headers:
+                fields = pd.DataFrame([[match.group(header) for header in timestamp_headers]
+                                       for match in matches[key]], columns=timestamp_headers, dtype=object)
+                timestamp_rate = int(_parse_timestamp_fields(fields).sum()) / len(lines)
+            best_timestamp_rate = max(best_timestamp_rate, timestamp_rate)
+            scores[key] = (timestamp_rate, match_rate)
+        return scores
+
+    def detect(self, log_file_path, sample_size=100, min_match_rate=0.5):
+        stat = os.stat(log_file_path)
+        cache_key = (os.path.abspath(log_file_path), stat.st_size, stat.st_mtime_ns)
+        if cache_key not in self._detected:
+            sample_lines = []
+            for _, line in iter_log_lines(log_file_path):
+                sample_lines.append(line)
+                if len(sample_lines) >= sample_size:
+                    break
+            scores = self.score(sample_lines)
+            best = max(scores, key=lambda key: (scores[key], self.formats[key][3]), default=None)
+            self._detected[cache_key] = best if best is not None and scores[best][0] >= min_match_rate else None
+        return self._detected[cache_key]
+
+log_format_registry = LogFormatRegistry(benchmark_settings)
+
 def get_parameter_list(template, input_string):
     # Replace placeholders with a unique string
     template_regex = re.sub(r"<.{1,5}>", "PLACEHOLDER", template)
@@ -208,128 +477,833 @@ def get_parameter_list(template, input_string):
       
     return preceding_combined_corrected
 
-def get_parameter_list_generic(template, input_string):
+def compile_template_regex(template):
+    """ Function to compile the regex matching a template, with one capturing group per placeholder
+    """
     # Convert placeholders into a unique string
     template_regex = re.sub(r"<.{1,5}>", "PLACEHOLDER", template)
-    
+
     # Escape special characters and replace the unique string with a capturing group
     template_regex = re.escape(template_regex).replace("PLACEHOLDER", "(.*?)")
-    
+
     # Make the pattern flexible for spaces, underscores, and hyphens
     template_regex = template_regex.replace("\\ ", "[\\s_-]+")
-    template_regex = "^" + template_regex + "$"
-    
+    return re.compile("^" + template_regex + "$")
+
+class TemplateMatcherCache:
+    """ Compiled template regexes keyed by Drain cluster id
+
+    Drain generalizes a cluster's template in place when a new message only partially matches it,
+    so every entry remembers the template revision it was compiled from and is recompiled on change.
+    """
+
+    def __init__(self):
+        self._matchers = {}
+
+    def get(self, cluster_id, template):
+        entry = self._matchers.get(cluster_id)
+        if entry is None or entry[0] != template:
+            entry = (template, compile_template_regex(template))
+            self._matchers[cluster_id] = entry
+        return entry[1]
+
+    def __len__(self):
+        return len(self._matchers)
+
+def get_parameter_list_generic(template, input_string, template_regex=None):
+    # Compile the template regex unless a cached one is given
+    if template_regex is None:
+        template_regex = compile_template_regex(template)
+
     # Extract parameters
-    match_objects = list(re.finditer(template_regex, input_string))
-    
+    match_obj = template_regex.match(input_string)
+
     # Lists to hold the results
     parameters_without_preceding = []
     parameters_with_preceding = []
-    
-    for match_obj in match_objects:
+
+    if match_obj is not None:
         for group_num in range(1, len(match_obj.groups()) + 1):
             pos = match_obj.span(group_num)
-            preceding_match = re.search(r"([^\s]+)\s*$", input_string[:pos[0]])
-            preceding_chars = preceding_match.group(1) if preceding_match else ""
+            # Last whitespace-separated word before the parameter, if any
+            preceding_words = input_string[:pos[0]].rsplit(None, 1)
+            preceding_chars = preceding_words[-1] if preceding_words else ""
             matched_value = match_obj.group(group_num)
-            
+
             parameters_without_preceding.append(matched_value)
             parameters_with_preceding.append(preceding_chars + matched_value)
-      
+
     return parameters_without_preceding, parameters_with_preceding
     
-def parse_log_file(log_file_path, pattern=None, headers=None):
-    # Initialize the template miner
-    template_miner = TemplateMiner()
+# Columns of parsed logs that are never dictionary-encoded: unique per line, or lists
+NON_CATEGORICAL_COLUMNS = ['Original Log', 'Parameters', 'Parameters_without_categories']
+
+def compact_parsed_log(df):
+    """ Function to store the string columns of a parsed log (EventTemplate, Content, Component, ...) as
+        categoricals and the event ids as int32, in place. Returns df.
+    """
+    for column in df.columns:
+        dtype = df[column].dtype
+        if column in NON_CATEGORICAL_COLUMNS or isinstance(dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype):
+            df[column] = df[column].astype('category')
+    if 'EventID' in df.columns:
+        dtype = df['EventID'].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        if pd.api.types.is_integer_dtype(dtype):
+            df['EventID'] = df['EventID'].astype('int32')
+    return df
 
-    # Read the log file
-    with open(log_file_path, 'r') as file:
-        log_lines = file.readlines()
+def concat_parsed_logs(dfs, ignore_index=False):
+    """ Function to concatenate parsed log chunks, categorical columns stay categorical (with the union
+        of the categories of the chunks) instead of falling back to object columns. The chunks are left
+        untouched, their columns are recategorized on shallow copies
+    """
+    dfs = [df.copy(deep=False) for df in dfs]
+    for column in dfs[0].columns:
+        if all(isinstance(df[column].dtype, pd.CategoricalDtype) for df in dfs):
+            categories = pd.api.types.union_categoricals([df[column] for df in dfs]).categories
+            for df in dfs:
+                df[column] = df[column].cat.set_categories(categories)
+    return pd.concat(dfs, ignore_index=ignore_index)
 
-    # Detect timestamp format from the first line
-    first_timestamp = detect_timestamp_format(log_lines[0])
-    if first_timestamp is None:
-        print("Error: Couldn't detect timestamp format from the first log line.")
-        return None
+def get_memory_report(df):
+    """ Function to report the deep memory usage of every column of a DataFrame, largest first,
+        with a 'Total' row
+    """
+    usage = df.memory_usage(deep=True)
+    report = pd.DataFrame({
+        'dtype': [str(df.index.dtype) if column == 'Index' else str(df[column].dtype) for column in usage.index],
+        'MB': usage.values / 2 ** 20,
+    }, index=usage.index).sort_values('MB', ascending=False)
+    report['Bytes/row'] = report['MB'] * 2 ** 20 / max(len(df), 1)
+    report.loc['Total'] = ['', report['MB'].sum(), report['Bytes/row'].sum()]
+    return report
+
+def _new_chunk():
+    return {
+        'log_texts': [], 'event_templates': [], 'original_logs': [], 'parameters': [], 'parameters_wo': [],
+        'log_messages': [], 'log_offsets': [], 'log_lengths': [],
+    }
+
+def _chunk_to_df(chunk, headers, start_index, timestamp_format, first_unix_time, store_original_log=True,
+                 year_starts=None):
+    """ Function to turn the per-line lists of one chunk into a compact DataFrame (see compact_parsed_log),
+        parsing its timestamps in bulk. Without store_original_log, the raw lines are replaced by their
+        'Log Offset' and 'Log Length' in bytes.
+    """
+    index = pd.RangeIndex(start_index, start_index + len(chunk['log_texts']))
+    logdf = pd.DataFrame(chunk['log_messages'], columns=headers, index=index)
+    years = get_years(chunk['log_offsets'], year_starts) if year_starts else None
+    timestamps = parse_timestamps(get_timestamp_strings(logdf, chunk['original_logs']), timestamp_format, years)
+    unix_times = to_unix_time(timestamps)
+    df = pd.DataFrame({
+        'Timestamp': timestamps,
+        'EventTemplate': chunk['log_texts'],
+        'EventID': chunk['event_templates'],
+        **({'Original Log': chunk['original_logs']} if store_original_log else
+           {'Log Offset': pd.array(chunk['log_offsets'], dtype='int64'),
+            'Log Length': pd.array(chunk['log_lengths'], dtype='int32')}),
+        'Unix Time': unix_times,
+        'Normalized Timestamp': unix_times - first_unix_time,
+        'Parameters': chunk['parameters'],
+        'Parameters_without_categories': chunk['parameters_wo'],
+    }, index=index)
+    return compact_parsed_log(pd.concat([df, logdf], axis=1))
+
+def extract_log_fields(line, pattern, headers):
+    """ Function to split a log line into its header fields, lines that don't match the format
+        are kept whole as content
+    """
+    match = pattern.search(line.strip()) if pattern is not None else None
+    if match is not None:
+        return [match.group(header) for header in headers]
+    return [None] * (len(headers) - 1) + [line.strip()] if headers else [line.strip()]
+
+def get_year_starts(log_file_path, pattern=None, headers=None, timestamp_format=None, start=0, end=None,
+                    previous_month=None, previous_year=None, chunk_size=100000):
+    """ Function to find the years of a log whose timestamps have none, the same way as logparser.get_time_full
+
+    The year goes up whenever the month goes back by more than 6 (e.g. Dec -> Jan), and the last line is taken
+    to be the most recent date up to the modification time of the file, unless previous_year, the year of
+    the line before start (of month previous_month), is given. The lines of [start, end) are read once.
+    Returns [(byte offset, year)] of the lines from which the year applies, see get_years (empty when
+    timestamp_format has a year or no line has a parseable timestamp).
+    """
+    if timestamp_format is None or has_year(timestamp_format):
+        return []
+
+    # Only the timestamp fields are needed, joined like get_timestamp_strings
+    timestamp_headers = [header for header in headers or [] if header in TIMESTAMP_HEADERS]
+    year_changes, total_rollovers = [(start, 0)], 0
+    lines, offsets = [], []
+    raw_lines = iter_raw_log_lines(log_file_path, start=start, end=end)
+    while True:
+        for offset, raw_line in raw_lines:
+            lines.append(raw_line.decode('utf-8', errors='replace'))
+            offsets.append(offset)
+            if len(lines) >= chunk_size:
+                break
+        if not lines:
+            break
+        if pattern is not None and timestamp_headers:
+            matches = [pattern.search(line.strip()) for line in lines]
+            timestamp_strings = pd.Series([' '.join(match.group(0, *timestamp_headers)[1:]) if match else None
+                                           for match in matches], dtype=object)
+        else:
+            timestamp_strings = get_timestamp_strings(pd.DataFrame(index=pd.RangeIndex(len(lines))), lines)
+        timestamps = to_datetime(timestamp_strings, timestamp_format)
+        parsed = timestamps.notna().to_numpy()
+        if parsed.any():
+            months = timestamps.dt.month.to_numpy()[parsed]
+            rollovers = total_rollovers + get_year_rollovers(months, previous_month)
+            parsed_offsets = np.asarray(offsets)[parsed]
+            for k in np.flatnonzero(np.diff(rollovers, prepend=total_rollovers)):
+                year_changes.append((int(parsed_offsets[k]), int(rollovers[k])))
+            total_rollovers, previous_month = rollovers[-1], months[-1]
+        lines, offsets = [], []
 
-    first_unix_time = time.mktime(first_timestamp.timetuple())
+    if previous_year is None:
+        if previous_month is None:
+            return []
+        reference_time = pd.Timestamp(os.path.getmtime(log_file_path), unit='s')
+        previous_year = infer_first_year(previous_month, total_rollovers, reference_time)
+    return [(offset, previous_year + rollovers) for offset, rollovers in year_changes]
 
-    # Define a regex pattern to extract timestamp, PID, and process name
-    # Adjust this pattern based on your log format
-    # log_format = '<Date> <Time> <Pid> <Level> <Component>: <Content>'
-    #pattern = re.compile(r'(?P<Time>[\d\-:\s]+)\s+(?P<Pid>\d+)\s+(?P<process>\w+)\s+(?P<Level>\w+)\s+(?P<Component>\w+):\s+(?P<Content>)')
+def get_years(offsets, year_starts):
+    """ Function to look up the year of lines from their byte offsets, see get_year_starts
+    """
+    starts, years = zip(*year_starts)
+    return np.asarray(years)[np.maximum(np.searchsorted(starts, offsets, side='right') - 1, 0)]
 
-    # Process each log line and store results in lists
-    timestamps, pids, processes, log_texts, event_templates, original_logs, unix_times, parameters, parameters_wo,normalized_timestamps = [], [], [], [], [], [], [], [], [], []
-    cnt = 0
-    log_messages = []
-    for line in log_lines:
-        # Extract fields using regex
-        cnt += 1
+def detect_log_timestamps(log_file_path, pattern=None, headers=None, sample_size=100, start=0, end=None):
+    """ Function to infer the timestamp format from the first sample_size lines of a log file
+
+    Returns the format (None if no candidate matches), the unix time of the first line (None if it has no
+    parseable timestamp) and the years of the lines of [start, end) when the format has none (see get_year_starts).
+    """
+    sample_lines, first_offset = [], start
+    for offset, line in iter_log_lines(log_file_path, start=start, end=end):
+        if not sample_lines:
+            first_offset = offset
+        sample_lines.append(line)
+        if len(sample_lines) >= sample_size:
+            break
+    if not sample_lines:
+        return None, None, []
+
+    logdf = pd.DataFrame([extract_log_fields(line, pattern, headers) for line in sample_lines], columns=headers)
+    timestamp_strings = get_timestamp_strings(logdf, sample_lines)
+    timestamp_format = infer_timestamp_format(timestamp_strings, sample_size=sample_size)
+    year_starts = get_year_starts(log_file_path, pattern, headers, timestamp_format, start=start, end=end)
+    years = get_years([first_offset], year_starts) if year_starts else None
+    first_unix_time = to_unix_time(parse_timestamps(timestamp_strings[:1], timestamp_format, years)).iloc[0]
+    return timestamp_format, None if pd.isna(first_unix_time) else first_unix_time, year_starts
+
+# Compressions of log files, by magic bytes
+COMPRESSION_MAGIC = [(b'\x1f\x8b', 'gz'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'), (b'\x28\xb5\x2f\xfd', 'zst')]
+
+COMPRESSION_EXTENSIONS = ['.' + compression for _, compression in COMPRESSION_MAGIC]
+
+def get_compression(log_file_path):
+    """ Function to detect the compression of a file from its magic bytes, None for plain files
+    """
+    with open(log_file_path, 'rb') as file:
+        head = file.read(6)
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+def strip_compression_extension(filename):
+    """ Function to drop a compression extension from a file name, e.g. "OpenSSH_2k.log.gz" -> "OpenSSH_2k.log"
+    """
+    root, extension = os.path.splitext(filename)
+    return root if extension.lower() in COMPRESSION_EXTENSIONS else filename
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading .zst logs requires zstandard, install it with `pip install zstandard`") from e
+    return zstandard
+
+class ThreadedDecompressionReader(io.RawIOBase):
+    """ Read-only raw stream that decompresses a file object in a background thread
+
+    Blocks of block_size decompressed bytes are handed over through a queue of at most max_blocks, so
+    decompression (which releases the GIL) overlaps with parsing the previous blocks while memory stays bounded.
+    """
+
+    def __init__(self, file, block_size=1 << 20, max_blocks=8):
+        self._file = file
+        self._queue = queue.Queue(maxsize=max_blocks)
+        self._stop = threading.Event()
+        self._error = None
+        self._block = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._decompress, args=(block_size,), daemon=True)
+        self._thread.start()
+
+    def _put(self, block):
+        # Give up when the reader was closed before consuming everything
+        while not self._stop.is_set():
+            try:
+                self._queue.put(block, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _decompress(self, block_size):
         try:
-            match = pattern.search(line.strip()) if pattern is not None else None
-            message = [match.group(header) for header in headers]
-            log_messages.append(message)
-            if cnt == 20000000:
-                print(message)
-                cnt += 1
+            while True:
+                block = self._file.read(block_size)
+                if not self._put(block) or not block:
+                    return
         except Exception as e:
-                    # print("\n", line)
-                    # print(e)
-                pass
+            self._error = e
+            self._put(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._block and not self._eof:
+            self._block = memoryview(self._queue.get())
+            if not self._block:
+                self._eof = True
+                if self._error is not None:
+                    raise self._error
+        size = min(len(buffer), len(self._block))
+        buffer[:size] = self._block[:size]
+        self._block = self._block[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._file.close()
+        super().close()
+
+def open_log_file(log_file_path, mode='rb', threaded=True):
+    """ Function to open a plain or compressed (gzip, bz2, xz, zstd) log file for reading
+
+    The compression is detected from the magic bytes, not the extension, and the content is decompressed
+    while it is read, so compressed logs never have to be decompressed to disk. With threaded, decompression
+    runs in a background thread (see ThreadedDecompressionReader). mode is 'rb' or 'r'; text mode decodes
+    compressed content as utf-8, replacing invalid bytes.
+    """
+    compression = get_compression(log_file_path)
+    if compression is None:
+        return open(log_file_path, mode)
+
+    if compression == 'gz':
+        file = gzip.open(log_file_path, 'rb')
+    elif compression == 'bz2':
+        file = bz2.open(log_file_path, 'rb')
+    elif compression == 'xz':
+        file = lzma.open(log_file_path, 'rb')
+    else:
+        file = _import_zstandard().ZstdDecompressor().stream_reader(open(log_file_path, 'rb'), closefd=True)
+    if threaded:
+        file = io.BufferedReader(ThreadedDecompressionReader(file))
+    if 'b' not in mode:
+        file = io.TextIOWrapper(file, encoding='utf-8', errors='replace')
+    return file
+
+def iter_raw_log_lines(log_file_path, start=0, end=None):
+    """ Generator over (byte offset, undecoded line) of a log file, restricted to the byte range [start, end)
+        when given. start must be at the beginning of a line. Compressed files are decompressed on the fly,
+        their offsets are positions in the decompressed content.
+    """
+    with open_log_file(log_file_path) as file:
+        if file.seekable():
+            file.seek(start)
+        else:
+            remaining = start
+            while remaining > 0:
+                skipped = len(file.read(min(remaining, 1 << 20)))
+                if not skipped:
+                    break
+                remaining -= skipped
+        offset = start
+        for raw_line in file:
+            if end is not None and offset >= end:
+                break
+            yield offset, raw_line
+            offset += len(raw_line)
+
+def iter_log_lines(log_file_path, start=0, end=None):
+    """ Generator over (byte offset, line) of a log file, see iter_raw_log_lines
+    """
+    for offset, raw_line in iter_raw_log_lines(log_file_path, start=start, end=end):
+        yield offset, raw_line.decode('utf-8', errors='replace')
+
+class RawLogReader:
+    """ Lazy access to the raw lines of a plain log file through a read-only memory map
+
+    Pairs with DataFrames parsed with store_original_log=False: a line is fetched in O(1) from its
+    'Log Offset' and 'Log Length', so the raw lines of huge logs never have to be held in memory.
+    """
+
+    def __init__(self, log_file_path):
+        if get_compression(log_file_path) is not None:
+            raise ValueError(f"{log_file_path} is compressed, its lines can't be memory-mapped")
+        self.log_file_path = log_file_path
+        self._file = open(log_file_path, 'rb')
+        self._mmap = None
+
+    def _get_mmap(self, end):
+        # Map the file again if it grew past the current mapping since it was opened
+        if self._mmap is None or end > len(self._mmap):
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def get_line(self, offset, length):
+        """ Returns the line of length bytes at offset
+        """
+        return self._get_mmap(offset + length)[offset:offset + length].decode('utf-8', errors='replace')
+
+    def get_lines(self, df):
+        """ Returns the raw lines of the rows of a parsed DataFrame, as an 'Original Log' Series
+        """
+        lines = [self.get_line(offset, length) for offset, length in zip(df['Log Offset'], df['Log Length'])]
+        return pd.Series(lines, index=df.index, name='Original Log', dtype=object)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def iter_parse_log_file(log_file_path, pattern=None, headers=None, chunk_size=100000, template_miner=None,
+                        start=0, end=None, first_unix_time=None, timestamp_format=None, start_index=0,
+                        masking_regex=None, store_original_log=True, year_starts=None):
+    """ Generator that parses a log file incrementally and yields DataFrame chunks of at most chunk_size rows
+
+    The file is read line by line and only the current chunk is held in memory, so memory stays flat
+    regardless of the input size. All chunks are mined with the same TemplateMiner, so EventIDs are
+    consistent across chunks, and the chunk indexes continue where the previous chunk stopped.
+    start/end restrict parsing to a byte range of the file and start_index is the index of its first line.
+    The timestamp format is inferred once from the first lines and first_unix_time, the reference for
+    'Normalized Timestamp', is the time of the first parsed line, unless they are given, as well as
+    year_starts, the years of timestamps without one (see get_year_starts).
+    When masking_regex is given, its matches are replaced by the miner's wildcard before mining
+    (parameters are still extracted from the unmasked content).
+    Without store_original_log, the raw lines are kept as byte offsets and lengths (see RawLogReader),
+    except for compressed files, which can't be memory-mapped.
+    """
+    if first_unix_time is None or timestamp_format is None:
+        detected_format, detected_first_unix_time, detected_year_starts = detect_log_timestamps(
+            log_file_path, pattern, headers, start=start, end=end)
+        timestamp_format = timestamp_format or detected_format
+        first_unix_time = first_unix_time if first_unix_time is not None else detected_first_unix_time
+        year_starts = year_starts if year_starts is not None else detected_year_starts
+        if first_unix_time is None:
+            print("Error: Couldn't detect timestamp format from the first log line.")
+            return
+
+    # Initialize the template miner
+    if template_miner is None:
+        template_miner = TemplateMiner()
+    mask = get_mask(template_miner)
+
+    if not store_original_log and get_compression(log_file_path) is not None:
+        print(f"(parse_log.py) {log_file_path} is compressed, storing its original lines")
+        store_original_log = True
+
+    chunk = _new_chunk()
+    matcher_cache = TemplateMatcherCache()
+
+    for offset, raw_line in iter_raw_log_lines(log_file_path, start=start, end=end):
+        line = raw_line.decode('utf-8', errors='replace')
+        message = extract_log_fields(line, pattern, headers)
+        chunk['log_messages'].append(message)
 
         # Parse the log line using drain3
         content = message[-1]
-        #print(f'content:{content}')
-        result = template_miner.add_log_message(content)
-        #print(result.keys())
+        masked_content = masking_regex.sub(mask, content) if masking_regex is not None else content
+        result = template_miner.add_log_message(masked_content)
+
         # Extract desired fields
-        log_texts.append(result["template_mined"])
-        event_templates.append(result["cluster_id"])
-        original_logs.append(line)
-
-        # Convert timestamp to unix time
-        current_timestamp = detect_timestamp_format(line)
-        if current_timestamp:
-            current_unix_time = time.mktime(current_timestamp.timetuple())
-            unix_times.append(current_unix_time)
-            normalized_timestamps.append(current_unix_time - first_unix_time)
-        else:
-            unix_times.append(None)
-            normalized_timestamps.append(None)
+        chunk['log_texts'].append(result["template_mined"])
+        chunk['event_templates'].append(result["cluster_id"])
+        chunk['original_logs'].append(line)
+        chunk['log_offsets'].append(offset)
+        chunk['log_lengths'].append(len(raw_line))
 
         # Extract parameters
-        #params_with_categories = template_miner.extract_parameters(result["template_mined"], content)
-        parameters_wo_categories,params_with_categories = get_parameter_list_generic(result["template_mined"], content)
-        parameters.append(params_with_categories)
-        parameters_wo.append(parameters_wo_categories)
-        timestamps.append(current_timestamp)
-     
+        template_regex = matcher_cache.get(result["cluster_id"], result["template_mined"])
+        parameters_wo_categories, params_with_categories = get_parameter_list_generic(result["template_mined"], content,
+                                                                                      template_regex=template_regex)
+        # Parameters repeat a lot (IPs, users, ...), interning keeps a single copy of every distinct value
+        chunk['parameters'].append([sys.intern(parameter) for parameter in params_with_categories])
+        chunk['parameters_wo'].append([sys.intern(parameter) for parameter in parameters_wo_categories])
 
-    
-    # Convert lists to DataFrame
-    try:
-        logdf = pd.DataFrame(log_messages, columns=headers)
-        df = pd.DataFrame({
-            'Timestamp': timestamps,
-            'Content': log_texts,
-            'EventID': event_templates,
-            'Original Log': original_logs,
-            'Unix Time': unix_times,
-            'Normalized Timestamp': normalized_timestamps,
-            'Parameters': parameters,
-            'Parameters_without_categories': parameters_wo,
-        })
-        df = pd.concat([df, logdf], axis=1)
-        #print(f'{len(log_messages)}')
-    except:
-        df = None
-        print(f'length of arrays : {len(timestamps), len(processes), len(log_texts), len(event_templates), len(original_logs), len(unix_times), len(normalized_timestamps)}')
+        if len(chunk['log_texts']) >= chunk_size:
+            yield _chunk_to_df(chunk, headers, start_index, timestamp_format, first_unix_time, store_original_log,
+                               year_starts)
+            start_index += len(chunk['log_texts'])
+            chunk = _new_chunk()
+
+    if chunk['log_texts']:
+        yield _chunk_to_df(chunk, headers, start_index, timestamp_format, first_unix_time, store_original_log,
+                           year_starts)
+
+def parse_log_file(log_file_path, pattern=None, headers=None, chunk_size=100000, masking_regex=None,
+                   store_original_log=True):
+    chunks = list(iter_parse_log_file(log_file_path, pattern=pattern, headers=headers, chunk_size=chunk_size,
+                                      masking_regex=masking_regex, store_original_log=store_original_log))
+    if not chunks:
+        return None
+
+    return concat_parsed_logs(chunks)
+
+def get_complete_lines_end(log_file_path):
+    """ Function to find the byte offset right after the last newline of a file, so a line that is still
+        being written is left for the next run
+    """
+    with open(log_file_path, 'rb') as file:
+        end = file.seek(0, os.SEEK_END)
+        while end > 0:
+            block_start = max(0, end - 65536)
+            file.seek(block_start)
+            newline = file.read(end - block_start).rfind(b'\n')
+            if newline != -1:
+                return block_start + newline + 1
+            end = block_start
+    return 0
+
+class LogSourcePersistence(PersistenceHandler):
+    """ File-based Drain3 persistence keyed per log source, which also records how far the source was parsed
+
+    TemplateMiner snapshots are buffered in memory and only written to disk by commit(), together with the
+    byte offset they correspond to, so the saved miner state and offset always match.
+    """
+
+    def __init__(self, log_file_path, state_dir):
+        self.log_file_path = log_file_path
+        source_key = hashlib.sha1(os.path.abspath(log_file_path).encode('utf-8')).hexdigest()[:16]
+        base_path = os.path.join(state_dir, os.path.basename(log_file_path) + '.' + source_key)
+        self.state_path = base_path + '.drain3'
+        self.progress_path = base_path + '.progress.json'
+        self._state = None
+        os.makedirs(state_dir, exist_ok=True)
+
+    def save_state(self, state):
+        self._state = state
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, 'rb') as f:
+            return f.read()
 
+    def _get_head_hash(self):
+        # The first line identifies the file, it changes when the log is rotated
+        with open(self.log_file_path, 'rb') as f:
+            return hashlib.sha1(f.readline()).hexdigest()
+
+    def load_progress(self):
+        """ Returns the progress dict of the previous run ('offset', 'num_lines', 'first_unix_time',
+            'timestamp_format', and 'last_month' and 'last_year' of the last parsed timestamp), reset to the start
+            of the file when it was truncated or rotated since
+        """
+        progress = {'offset': 0, 'num_lines': 0, 'first_unix_time': None, 'timestamp_format': None,
+                    'last_month': None, 'last_year': None}
+        if os.path.exists(self.progress_path):
+            with open(self.progress_path) as f:
+                saved = json.load(f)
+            if saved['offset'] <= os.path.getsize(self.log_file_path) and saved['head_hash'] == self._get_head_hash():
+                progress.update(saved)
+            else:
+                print(f"(parse_log.py) {self.log_file_path} was truncated or rotated, parsing it from the start")
+        return progress
+
+    def commit(self, template_miner, progress):
+        template_miner.persistence_handler = self
+        template_miner.save_state("commit")
+        progress = dict(progress, head_hash=self._get_head_hash())
+        for path, data in [(self.state_path, self._state), (self.progress_path, json.dumps(progress).encode('utf-8'))]:
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+
+def parse_log_file_incremental(log_file_path, state_dir, pattern=None, headers=None, chunk_size=100000,
+                               masking_regex=None, store_original_log=True):
+    """ Function to parse only the lines appended to a log file since the previous run
+
+    The Drain3 state and the processed byte offset are kept per log file in state_dir, so cluster ids stay
+    stable across runs and re-running on a file that only grew parses just its new tail. Returns the
+    DataFrame of the new lines (indexed after the previously parsed ones), or None when nothing was appended.
+    Compressed logs can't be resumed at a byte offset, they are parsed as a whole again whenever their size
+    changes (the DataFrame then starts at index 0 and replaces the previous output, see parse_log_file_from_file).
+    """
+    persistence = LogSourcePersistence(log_file_path, state_dir)
+    progress = persistence.load_progress()
+    compressed = get_compression(log_file_path) is not None
+    end = os.path.getsize(log_file_path) if compressed else get_complete_lines_end(log_file_path)
+    if end <= progress['offset']:
+        return None
+    start, start_index = (0, 0) if compressed else (progress['offset'], progress['num_lines'])
+
+    # Restore the saved state, snapshots are then only taken when committing
+    template_miner = TemplateMiner(persistence_handler=persistence)
+    template_miner.persistence_handler = None
+
+    # Years of timestamps without one continue from the last line of the previous run
+    if progress['first_unix_time'] is None:
+        progress['timestamp_format'], progress['first_unix_time'], year_starts = detect_log_timestamps(
+            log_file_path, pattern, headers, end=None if compressed else end)
+    else:
+        previous_month, previous_year = (None, None) if start == 0 else (progress['last_month'], progress['last_year'])
+        year_starts = get_year_starts(log_file_path, pattern, headers, progress['timestamp_format'], start=start,
+                                      end=None if compressed else end, previous_month=previous_month,
+                                      previous_year=previous_year)
+
+    chunks = list(iter_parse_log_file(log_file_path, pattern=pattern, headers=headers, chunk_size=chunk_size,
+                                      template_miner=template_miner, start=start, end=None if compressed else end,
+                                      first_unix_time=progress['first_unix_time'],
+                                      timestamp_format=progress['timestamp_format'],
+                                      start_index=start_index, masking_regex=masking_regex,
+                                      store_original_log=store_original_log, year_starts=year_starts))
+    if not chunks:
+        return None
+
+    df = concat_parsed_logs(chunks)
+    timestamps = df['Timestamp'].dropna()
+    if len(timestamps):
+        progress.update(last_month=int(timestamps.iloc[-1].month), last_year=int(timestamps.iloc[-1].year))
+    persistence.commit(template_miner, dict(progress, offset=end, num_lines=start_index + len(df)))
     return df
 
+def get_byte_range_shards(log_file_path, num_shards):
+    """ Function to split a file into at most num_shards contiguous byte ranges aligned to line starts
+    """
+    size = os.path.getsize(log_file_path)
+    bounds = [0]
+    with open(log_file_path, 'rb') as file:
+        for k in range(1, num_shards):
+            file.seek(max(size * k // num_shards, bounds[-1]))
+            file.readline()  # Move to the start of the next line
+            bounds.append(file.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def _parse_shard(log_file_path, start, end, pattern, headers, first_unix_time, timestamp_format, masking_regex=None,
+                 store_original_log=True, year_starts=None):
+    # Each worker mines its shard with its own TemplateMiner and returns the shard's final templates
+    template_miner = TemplateMiner()
+    chunks = list(iter_parse_log_file(log_file_path, pattern=pattern, headers=headers, chunk_size=float('inf'),
+                                      template_miner=template_miner, start=start, end=end,
+                                      first_unix_time=first_unix_time, timestamp_format=timestamp_format,
+                                      masking_regex=masking_regex, store_original_log=store_original_log,
+                                      year_starts=year_starts))
+    df = chunks[0] if chunks else None
+    templates = {cluster.cluster_id: cluster.get_template() for cluster in template_miner.drain.clusters}
+    return df, templates
+
+def reconcile_shard_templates(shard_results):
+    """ Function to merge per-shard cluster ids into one global template table
+
+    The final template of every local cluster is fed to a fresh TemplateMiner, shard by shard and in order
+    of first appearance within the shard, so identical (or similar enough) templates mined by different
+    workers collapse into one cluster and the global EventIDs only depend on the input and the sharding.
+    Returns a list with one {local cluster id: global cluster id} dict per shard and the global templates.
+    """
+    template_miner = TemplateMiner()
+    id_maps = []
+    for df, templates in shard_results:
+        id_map = {}
+        if df is not None:
+            for local_id in pd.unique(df['EventID']):
+                result = template_miner.add_log_message(templates[local_id])
+                id_map[local_id] = result["cluster_id"]
+        id_maps.append(id_map)
+
+    global_templates = {cluster.cluster_id: cluster.get_template() for cluster in template_miner.drain.clusters}
+    return id_maps, global_templates
+
+def parse_log_file_parallel(log_file_path, pattern=None, headers=None, n_jobs=None, masking_regex=None,
+                            store_original_log=True):
+    """ Function to parse a log file with n_jobs worker processes, one byte-range shard each
+
+    Shards are mined independently and their clusters are reconciled with reconcile_shard_templates,
+    so 'EventID' is a global, deterministic id and 'EventTemplate' holds the reconciled template of the cluster.
+    Compressed files can't be split into byte ranges and are parsed serially.
+    """
+    if get_compression(log_file_path) is not None:
+        print(f"(parse_log.py) {log_file_path} is compressed, parsing it serially")
+        return parse_log_file(log_file_path, pattern=pattern, headers=headers, masking_regex=masking_regex,
+                              store_original_log=store_original_log)
+
+    n_jobs = n_jobs or os.cpu_count()
+
+    # Detect timestamp format from the first lines, shared by all shards
+    timestamp_format, first_unix_time, year_starts = detect_log_timestamps(log_file_path, pattern, headers)
+    if first_unix_time is None:
+        print("Error: Couldn't detect timestamp format from the first log line.")
+        return None
+
+    shards = get_byte_range_shards(log_file_path, n_jobs)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(_parse_shard, log_file_path, start, end, pattern, headers, first_unix_time,
+                                   timestamp_format, masking_regex, store_original_log, year_starts)
+                   for start, end in shards]
+        shard_results = [future.result() for future in futures]
+
+    id_maps, global_templates = reconcile_shard_templates(shard_results)
+
+    dfs = []
+    for (df, _), id_map in zip(shard_results, id_maps):
+        if df is None:
+            continue
+        df['EventID'] = df['EventID'].map(id_map).astype('int32')
+        df['EventTemplate'] = df['EventID'].map(global_templates).astype('category')
+        dfs.append(df)
+    if not dfs:
+        return None
+
+    return concat_parsed_logs(dfs, ignore_index=True)
+
+# Output formats of parsed logs, by file extension
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Columns stored dictionary-encoded in the columnar formats
+DICTIONARY_COLUMNS = ['EventID', 'EventTemplate']
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError as e:
+        raise ImportError("The parquet and arrow output formats require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+class ParsedLogWriter:
+    """ Writes parsed log chunks to one csv, parquet or arrow (IPC file) output
+
+    In the columnar formats EventID and EventTemplate are dictionary-encoded, Parameters are list<string>
+    columns and timestamps are stored as timestamps. Dictionaries only grow from chunk to chunk, so every
+    chunk extends the previous dictionary instead of replacing it. The other categorical columns are written
+    as plain strings (parquet dictionary-encodes them per row group) and are categorical again once loaded.
+    """
+
+    def __init__(self, output_path, output_format='csv', append=False):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format}, expected one of {list(OUTPUT_FORMATS)}")
+        if append and output_format != 'csv':
+            raise ValueError("Only the csv output format can be appended to")
+        self.output_path = output_path
+        self.output_format = output_format
+        self.num_rows = 0
+        self._append = append and os.path.exists(output_path)
+        self._categories = {column: [] for column in DICTIONARY_COLUMNS}
+        self._schema = None
+        self._writer = None
+        self._sink = None
+
+    def _encode_dictionaries(self, df):
+        df = df.copy()
+        for column in df.columns:
+            if column not in self._categories and isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(df[column].cat.categories.dtype)
+        for column, categories in self._categories.items():
+            if column in df.columns:
+                known = set(categories)
+                categories.extend(value for value in pd.unique(df[column]) if value not in known and pd.notna(value))
+                df[column] = pd.Categorical(df[column], categories=categories)
+        return df
+
+    def _arrow_schema(self, df):
+        pa = _import_pyarrow()
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        fields = []
+        for field in schema:
+            if pa.types.is_dictionary(field.type):
+                field = pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+            elif pa.types.is_null(field.type):
+                field = pa.field(field.name, pa.string())
+            elif pa.types.is_list(field.type) and pa.types.is_null(field.type.value_type):
+                field = pa.field(field.name, pa.list_(pa.string()))
+            fields.append(field)
+        return pa.schema(fields, metadata=schema.metadata)
+
+    def write(self, df):
+        if self.output_format == 'csv':
+            first_write = self.num_rows == 0 and not self._append
+            df.to_csv(self.output_path, mode='w' if first_write else 'a', header=first_write, index=True)
+            self.num_rows += len(df)
+            return
+
+        pa = _import_pyarrow()
+        df = self._encode_dictionaries(df)
+        if self._writer is None:
+            self._schema = self._arrow_schema(df)
+            if self.output_format == 'parquet':
+                self._writer = pa.parquet.ParquetWriter(self.output_path, self._schema)
+            else:
+                self._sink = pa.OSFile(self.output_path, 'wb')
+                self._writer = pa.ipc.new_file(self._sink, self._schema,
+                                               options=pa.ipc.IpcWriteOptions(compression='zstd',
+                                                                              emit_dictionary_deltas=True))
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        self.num_rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def save_parsed_log(df, output_path, output_format='csv', append=False):
+    with ParsedLogWriter(output_path, output_format=output_format, append=append) as writer:
+        writer.write(df)
+
+def load_parsed_log(path):
+    """ Function to load a parsed log written by save_parsed_log/ParsedLogWriter, the format is taken from the extension
+    """
+    if path.endswith(OUTPUT_FORMATS['parquet']):
+        return compact_parsed_log(pd.read_parquet(path))
+    if path.endswith(OUTPUT_FORMATS['arrow']):
+        return compact_parsed_log(_import_pyarrow().feather.read_table(path).to_pandas())
+
+    # The csv format stores the parameter lists as Python reprs
+    converters = {column: ast.literal_eval for column in ['Parameters', 'Parameters_without_categories']}
+    df = pd.read_csv(path, index_col=0, converters=converters, parse_dates=['Timestamp'])
+    return compact_parsed_log(df)
+
+def parse_log_file_to_disk(log_file_path, output_path, pattern=None, headers=None, chunk_size=100000, output_format='csv',
+                           masking_regex=None, store_original_log=True):
+    """ Function to parse a log file chunk by chunk and write each chunk to output_path,
+        so files larger than memory can be parsed. Returns the number of parsed lines.
+    """
+    with ParsedLogWriter(output_path, output_format=output_format) as writer:
+        for chunk in iter_parse_log_file(log_file_path, pattern=pattern, headers=headers, chunk_size=chunk_size,
+                                         masking_regex=masking_regex, store_original_log=store_original_log):
+            writer.write(chunk)
+    return writer.num_rows
+
 def detect_delimiter(filename, sample_size=1024):
-    with open(filename, 'r') as f:
+    with open_log_file(filename, 'r', threaded=False) as f:
         sample = f.read(sample_size)
         sniffer = csv.Sniffer()
         try:
@@ -345,7 +1319,7 @@ def is_csv_content(filename, delimiter=None):
         if not delimiter:
             delimiter = ','
     try:
-        with open(filename, 'r') as f:
+        with open_log_file(filename, 'r', threaded=False) as f:
             reader = csv.reader(f, delimiter=delimiter)
             for _ in reader:  # Just iterate over a few rows to check
                 break
@@ -353,29 +1327,209 @@ def is_csv_content(filename, delimiter=None):
     except csv.Error:
         return False
 
-def parse_log_file_from_file(logName='OpenSSH_2k.log', delimiter=',',outdir='.',indir='.',save_file=True):
+def get_output_path(logName, outdir='.', output_format='csv', unique=False):
+    """ Function to build the path of the parsed output of a log, e.g. "OpenSSH_2k.log.gz" -> "<outdir>/OpenSSH_2k.log_templates.csv"
+        If unique, a short hash of the absolute log path is added, e.g. "<outdir>/auth.log-1f3a9c2e_templates.csv",
+        so that same-named logs of different directories get different outputs
+    """
+    name = strip_compression_extension(os.path.basename(logName))
+    if unique:
+        name += '-' + hashlib.sha256(os.path.abspath(os.path.expanduser(logName)).encode()).hexdigest()[:8]
+    return os.path.join(outdir, name + '_templates' + OUTPUT_FORMATS[output_format])
+
+def parse_log_file_from_file(logName='OpenSSH_2k.log', delimiter=',',outdir='.',indir='.',save_file=True,chunk_size=None,n_jobs=None,output_format='csv',state_dir=None,mask=True,store_original_log=True,output_path=None):
     
     logfileName = os.path.expanduser(indir) + logName
-    if logfileName.lower().endswith('.csv'):
-        df = pd.read_csv(logfileName)
+    if strip_compression_extension(logfileName).lower().endswith('.csv'):
+        with open_log_file(logfileName) as f:
+            df = pd.read_csv(f)
     else:
-        log_format = get_log_format(logName)
-        headers, pattern = generate_logformat_regex(log_format)
-        df = parse_log_file(logfileName, pattern=pattern, headers=headers)
+        log_format_name = get_log_format_name(logName, log_file_path=logfileName)
+        if log_format_name is None:
+            print("Unable to find the logformat ! This can lead to errors please take care of this:")
+            return None
+        headers, pattern = log_format_registry.get(log_format_name)
+        # Pre-mask the variable tokens of the format (block ids, IPs, ...) before Drain sees them
+        masking_regex = log_format_registry.get_masking_regex(log_format_name) if mask else None
+        output_path = output_path or get_output_path(logName, outdir, output_format)
+
+        # Incremental mode: only parse what was appended since the last run, csv outputs are appended to
+        # while the columnar formats get one part per run, suffixed with the index of its first line.
+        # Parses starting at line 0 (first run, or a compressed log parsed as a whole again) replace the output
+        if state_dir:
+            df = parse_log_file_incremental(logfileName, state_dir, pattern=pattern, headers=headers,
+                                            masking_regex=masking_regex, store_original_log=store_original_log)
+            if df is not None:
+                restart = df.index[0] == 0
+                extension = OUTPUT_FORMATS[output_format]
+                if output_format == 'csv':
+                    save_parsed_log(df, output_path, append=not restart)
+                else:
+                    stem = output_path[:-len(extension)]
+                    if restart:
+                        for part in glob.glob(glob.escape(stem) + '.*' + extension):
+                            if part[len(stem) + 1:-len(extension)].isdigit():
+                                os.remove(part)
+                    save_parsed_log(df, f"{stem}.{df.index[0]}{extension}", output_format=output_format)
+            return df
+
+        # Bounded-memory mode: stream chunks straight to disk instead of building the whole DataFrame
+        if chunk_size:
+            parse_log_file_to_disk(logfileName, output_path, pattern=pattern, headers=headers, chunk_size=chunk_size,
+                                   output_format=output_format, masking_regex=masking_regex,
+                                   store_original_log=store_original_log)
+            return output_path
+
+        if n_jobs and n_jobs > 1:
+            df = parse_log_file_parallel(logfileName, pattern=pattern, headers=headers, n_jobs=n_jobs,
+                                         masking_regex=masking_regex, store_original_log=store_original_log)
+        else:
+            df = parse_log_file(logfileName, pattern=pattern, headers=headers, masking_regex=masking_regex,
+                                store_original_log=store_original_log)
         #print(df.head())
     
-        df.to_csv(os.path.join(outdir,logName + '_templates.csv'), index=True)
+        save_parsed_log(df, output_path, output_format=output_format)
         return df
     
 
-# Example usage
-#log_file_path = "path_to_your_log_file.log"
+MANIFEST_NAME = 'manifest.json'
+
+def get_file_hash(path, block_size=1 << 20):
+    """ Function to compute the sha256 of a file's (raw, possibly compressed) content
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def find_log_files(paths, outdir=None):
+    """ Function to expand files, directories (their files, not recursively) and glob patterns (** allowed)
+        into a sorted list of log files, leaving out hidden files and the outputs and manifest of outdir
+    """
+    files = set()
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            candidates = [os.path.join(path, name) for name in os.listdir(path)]
+        else:
+            candidates = glob.glob(path, recursive=True) if glob.has_magic(path) else [path]
+        files.update(os.path.abspath(candidate) for candidate in candidates if os.path.isfile(candidate))
+
+    outputs = {MANIFEST_NAME} | {'_templates' + extension for extension in OUTPUT_FORMATS.values()}
+    return sorted(file for file in files
+                  if not os.path.basename(file).startswith('.')
+                  and not (outdir is not None and os.path.dirname(file) == os.path.abspath(outdir)
+                           and any(file.endswith(output) for output in outputs)))
+
+def load_manifest(outdir):
+    manifest_path = os.path.join(outdir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def save_manifest(outdir, manifest):
+    manifest_path = os.path.join(outdir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def _parse_directory_file(log_file_path, output_path, output_format, chunk_size, mask):
+    # Worker of parse_log_directory: parses one file chunk by chunk to output_path, None when its format is unknown
+    output_path = parse_log_file_from_file(os.path.basename(log_file_path),
+                                           indir=os.path.dirname(log_file_path) + os.sep, chunk_size=chunk_size,
+                                           output_format=output_format, mask=mask, output_path=output_path)
+    if not isinstance(output_path, str) or not os.path.exists(output_path):
+        return None
+    return output_path
+
+def parse_log_directory(paths, outdir='.', n_jobs=None, output_format='csv', chunk_size=100000, mask=True,
+                        force=False):
+    """ Function to parse many log files (files, directories or glob patterns) with a pool of n_jobs processes
+
+    Every file is parsed chunk by chunk to its own output in outdir, named after the file and a hash of its
+    absolute path (see get_output_path), and recorded in outdir/manifest.json with its sha256, size,
+    modification time and absolute output path. Files whose content hash didn't change since they were
+    recorded are skipped (the hash is only recomputed when the size or modification time changed), unless
+    force. At most 2 * n_jobs files are queued in the pool at a time.
+    Returns the manifest, {absolute log path: entry}.
+    """
+    n_jobs = n_jobs or os.cpu_count()
+    outdir = os.path.abspath(os.path.expanduser(outdir))
+    os.makedirs(outdir, exist_ok=True)
+    manifest = load_manifest(outdir)
+
+    log_files = [log_file_path for log_file_path in find_log_files(paths, outdir=outdir)
+                 if not strip_compression_extension(log_file_path).lower().endswith('.csv')]
+    output_paths = {log_file_path: get_output_path(log_file_path, outdir, output_format, unique=True)
+                    for log_file_path in log_files}
+    # Two jobs writing to the same output would overwrite each other, refuse the batch before starting any
+    log_files_by_output = {}
+    for log_file_path, output_path in output_paths.items():
+        if output_path in log_files_by_output:
+            raise ValueError(f"{log_files_by_output[output_path]} and {log_file_path} have the same output {output_path}")
+        log_files_by_output[output_path] = log_file_path
+
+    pending_files = []
+    for log_file_path in log_files:
+        stat = os.stat(log_file_path)
+        entry = manifest.get(log_file_path)
+        if entry is not None and (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            file_hash = entry['sha256']
+        else:
+            file_hash = get_file_hash(log_file_path)
+        # Files of unknown format are recorded without output and skipped as well until they change
+        if (not force and entry is not None and entry['sha256'] == file_hash and entry['error'] is None
+                and (entry['output'] is None or entry['output'] == output_paths[log_file_path]
+                     and os.path.exists(entry['output']))):
+            print(f"(parse_log.py) Skipping unchanged {log_file_path}")
+            continue
+        pending_files.append((log_file_path, {'sha256': file_hash, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}))
+
+    # Largest files first, so a big file doesn't start last and keep one worker busy alone
+    pending_files.sort(key=lambda pending_file: pending_file[1]['size'], reverse=True)
+    print(f"(parse_log.py) Parsing {len(pending_files)} log files with {n_jobs} processes")
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        running = {}
+        pending_files = iter(pending_files)
+        while True:
+            for log_file_path, entry in pending_files:
+                running[executor.submit(_parse_directory_file, log_file_path, output_paths[log_file_path],
+                                        output_format, chunk_size, mask)] = (log_file_path, entry)
+                if len(running) >= 2 * n_jobs:
+                    break
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                log_file_path, entry = running.pop(future)
+                try:
+                    entry = dict(entry, output=future.result(), error=None)
+                except Exception as e:
+                    print(f"(parse_log.py) Failed to parse {log_file_path}: {e}")
+                    entry = dict(entry, output=None, error=str(e))
+                entry['parsed_at'] = datetime.now().isoformat(timespec='seconds')
+                manifest[log_file_path] = entry
+            save_manifest(outdir, manifest)
+
+    return manifest
+
 
 if __name__ == '__main__':
 
-   # indir = r'C:\Users\addeepak\Desktop\LogAnalysis\input_logs\\'
-   # outdir = r'C:\Users\addeepak\Desktop\LogAnalysis\profile_figs\\'
-   indir = '.'
-   outdir = '.'
+    arg_parser = argparse.ArgumentParser(description="Parse log files into event templates with Drain3")
+    arg_parser.add_argument('paths', nargs='*', default=['OpenSSH_2k.log'],
+                            help="Log files, directories or glob patterns (quote them, ** is supported)")
+    arg_parser.add_argument('--outdir', default='.', help="Directory of the parsed outputs and of manifest.json")
+    arg_parser.add_argument('--jobs', type=int, default=None, help="Number of worker processes (default: all CPUs)")
+    arg_parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='csv', help="Output format")
+    arg_parser.add_argument('--chunk-size', type=int, default=100000, help="Lines parsed per chunk")
+    arg_parser.add_argument('--no-mask', action='store_true', help="Don't pre-mask with the format's regexes")
+    arg_parser.add_argument('--force', action='store_true', help="Parse files again even if they are unchanged")
+    args = arg_parser.parse_args()
 
-   parse_log_file_from_file(logName='OpenSSH_2k.log', delimiter=';',outdir='.',indir=indir)
+    parse_log_directory(args.paths, outdir=args.outdir, n_jobs=args.jobs, output_format=args.format,
+                        chunk_size=args.chunk_size, mask=not args.no_mask, force=args.force)